@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-import joblib
+import io
+import numpy as np
 import os # To check for file existence more robustly
 
 # --- Import custom modules ---
@@ -25,16 +26,27 @@ try:
     # Attempt to import feature_extraction from src.
     # This assumes 'src' is directly accessible in the Python path
     # (e.g., you're running streamlit from the project root).
-    from feature_extraction import create_features
+    from feature_extraction import MODEL_FEATURES, create_feature_matrix
 except ImportError as e:
     st.error(f"Error importing 'src.feature_extraction': {e}. "
             "Ensure 'src' is a Python package (has an __init__.py file) "
             "and your Streamlit app is run from the project's root directory.")
     st.stop() # Stop execution if a critical import fails
 
+from columnar_io import detect_format
+from ingestion import QUARANTINE_REASON, ROW_NUMBER, SchemaError, read_validated
+
+# Process-wide model registry and prediction cache (survive Streamlit reruns).
+from model_registry import content_hash, get_model, get_model_with_digest, prediction_cache
+from feature_transformer import FeatureTransformer, stats_path_for
+from rollup_store import get_rollup_store
+from result_store import get_result_store, row_hashes
+from drift_monitor import DriftMonitor, DriftProfile, drift_path_for
+from instrumentation import is_enabled, profile_run, prometheus_text, stage
+
 try:
     # Attempt to import dashboard display component
-    from components.burnout_dashboard import display_dashboard
+    from components.burnout_dashboard import display_dashboard, display_history, display_rollups
     # Attempt to import suggestions generator component
     from components.suggestions_generator import generate_suggestions
 except ImportError as e:
@@ -56,69 +68,170 @@ st.set_page_config(
 st.title("🧠 RemoteMind - Cognitive Load Tracker for Remote Workers")
 
 # --- File Uploader Widget ---
-# Allows users to upload their CSV data file.
-uploaded_file = st.file_uploader("Upload your data file (CSV)", type=["csv"])
+# Allows users to upload their data file (CSV, or Parquet/Arrow for large extracts).
+uploaded_file = st.file_uploader("Upload your data file (CSV, Parquet or Feather)",
+                                 type=["csv", "parquet", "feather", "arrow"])
 
 # --- Main Logic for File Processing and Prediction ---
 if uploaded_file is not None:
     # Read the uploaded CSV file into a pandas DataFrame.
     try:
-        df = pd.read_csv(uploaded_file)
-        st.success("File uploaded successfully. Processing data...")
-        
-        # --- Feature Engineering ---
-        # Call the custom function to create necessary features from the raw data.
-        # This function should ensure the DataFrame 'df' has the columns
-        # expected by the model (Video_Call_Score, Break_Efficiency, etc.).
-        processed_df = create_features(df.copy()) # Use .copy() to avoid SettingWithCopyWarning later
-
-        # --- Load Pre-trained Model ---
-        # Define the path to the saved model.
-        model_path = "models/burnout_model.pkl"
-
-        # Check if the model file exists before attempting to load it.
-        if not os.path.exists(model_path):
-            st.error(f"Error: Model file not found at '{model_path}'. "
-                    "Please ensure the 'models' folder and 'burnout_model.pkl' exist in your project root.")
-            st.stop() # Stop execution if the model isn't found
-            
-        model = joblib.load(model_path)
-        st.info("Machine learning model loaded.")
-
-        # --- Make Predictions ---
-        # Ensure the features used for prediction match the order and names
-        # the model was trained on. This is crucial!
-        required_features = ["Video_Call_Score", "Break_Efficiency", "Average_Screen_Time_Hours", "Cognitive_Load_Index"]
-
-        # Check if all required features exist in the processed DataFrame
-        if not all(feature in processed_df.columns for feature in required_features):
-            missing = [f for f in required_features if f not in processed_df.columns]
-            st.error(f"Error: Processed data is missing required features for prediction: {missing}. "
-                    "Please check the `create_features` function.")
-            st.stop()
-            
-        # Predict burnout index using the loaded model.
-        # Ensure that the input data 'processed_df[required_features]' is a DataFrame,
-        # not a Series, as the model expects a 2D array-like input.
-        processed_df["Predicted_Burnout_Index"] = model.predict(processed_df[required_features])
-        
-        st.success("Burnout index predictions completed successfully!")
+        # Each stage is timed when REMOTEMIND_PROFILE is set (no-op otherwise).
+        with profile_run("app_upload") as perf_run:
+            # Hash the raw upload so reruns on the same file can reuse earlier results.
+            file_bytes = uploaded_file.getvalue()
+            upload_digest = content_hash(file_bytes)
+            st.success("File uploaded successfully. Processing data...")
+
+            # --- Load Pre-trained Model ---
+            # Define the path to the saved model.
+            model_path = "models/burnout_model.pkl"
+
+            # Check if the model file exists before attempting to load it.
+            if not os.path.exists(model_path):
+                st.error(f"Error: Model file not found at '{model_path}'. "
+                        "Please ensure the 'models' folder and 'burnout_model.pkl' exist in your project root.")
+                st.stop() # Stop execution if the model isn't found
+
+            # The registry only unpickles the model the first time (or after the file changes).
+            with stage("model_load"):
+                model, model_digest = get_model_with_digest(model_path)
+
+                # Normalization statistics saved with the model. Older models without them
+                # fall back to normalizing by the upload's own statistics.
+                transformer = None
+                stats_path = stats_path_for(model_path)
+                if os.path.exists(stats_path):
+                    transformer, stats_digest = get_model_with_digest(stats_path, loader=FeatureTransformer.load)
+                    model_digest += stats_digest
+            st.info("Machine learning model loaded.")
+
+            # Ensure the features used for prediction match the order and names
+            # the model was trained on. This is crucial!
+            # (create_feature_matrix returns its columns in this same order.)
+            required_features = MODEL_FEATURES
+
+            result_store = get_result_store()
+
+            def score_upload():
+                # Parse with the declared schema's dtypes (no type inference) and set
+                # aside rows that break it; raises SchemaError if a required column is missing.
+                with stage("csv_parse") as timed:
+                    ingest = read_validated(io.BytesIO(file_bytes), fmt=detect_format(uploaded_file.name))
+                    scored_df = ingest.data
+                    timed.rows = ingest.rows
+                if len(scored_df) == 0:
+                    return scored_df, ingest, np.zeros(0, dtype=bool)
+
+                # --- Feature Engineering ---
+                # Compute all model features in one vectorized pass and attach them as
+                # columns; the freshly parsed frame is never copied.
+                with stage("features") as timed:
+                    screen_time_max = transformer.screen_time_max if transformer is not None else None
+                    features = create_feature_matrix(scored_df, screen_time_max=screen_time_max)
+                    for i, feature in enumerate(required_features):
+                        scored_df[feature] = features[:, i]
+                    timed.rows = len(scored_df)
+
+                # --- Make Predictions ---
+                # Predict burnout index using the loaded model.
+                # Ensure that the input data 'scored_df[required_features]' is a DataFrame,
+                # not a Series, as the model expects a 2D array-like input.
+                # Rows already in the result store (same content, same model) reuse
+                # their stored prediction; only the rest go through the model.
+                with stage("predict") as timed:
+                    hashes = row_hashes(scored_df)
+                    predictions = result_store.lookup(hashes, model_digest)
+                    unscored = np.isnan(predictions)
+                    if unscored.any():
+                        predictions[unscored] = model.predict(scored_df.loc[unscored, required_features])
+                    scored_df["Predicted_Burnout_Index"] = predictions
+                    timed.rows = int(unscored.sum())
+
+                # --- Store Results ---
+                # Append the newly scored rows to the persistent history; `new_rows`
+                # marks the rows it had not seen before under this model.
+                with stage("store_results") as timed:
+                    new_rows = result_store.add(scored_df, hashes, model_digest, batch_id=upload_digest)
+                    timed.rows = int(new_rows.sum())
+                return scored_df, ingest, new_rows
+
+            # Cached per (upload, model) pair; the returned frame is shared and read-only.
+            processed_df, ingest, new_rows = prediction_cache.get_or_compute(upload_digest, model_digest, score_upload)
+
+            # --- Quarantined Rows ---
+            # Rows that failed validation are left out of the predictions and offered for download.
+            st.info(f"Read {ingest.rows} rows in {ingest.seconds:.2f}s ({ingest.rows_per_sec:,.0f} rows/sec).")
+            if len(ingest.quarantine):
+                st.warning(f"{len(ingest.quarantine)} of {ingest.rows} rows failed validation and were skipped.")
+                st.dataframe(ingest.quarantine[[ROW_NUMBER, QUARANTINE_REASON]].head(20))
+                st.download_button("Download quarantined rows", ingest.quarantine.to_csv(index=False),
+                                   file_name="quarantine.csv", mime="text/csv")
+            if len(processed_df) == 0:
+                st.error("No valid rows to score. Please check the file against the expected data format.")
+                st.stop()
         
-        # --- Display Dashboard ---
-        # Call the component to visualize the data and predictions.
-        display_dashboard(processed_df)
+            st.success("Burnout index predictions completed successfully!")
+
+            # --- Input Drift Check ---
+            # Compare the upload's feature distributions with the training data
+            # (reference histograms saved next to the model by src/model.py).
+            drift_path = drift_path_for(model_path)
+            if os.path.exists(drift_path):
+                with stage("drift") as timed:
+                    drift_monitor = DriftMonitor(get_model(drift_path, loader=DriftProfile.load))
+                    drift_monitor.update(processed_df)
+                    drifted = {feature: scores for feature, scores in drift_monitor.summary()["features"].items()
+                               if scores["status"] != "stable"}
+                    timed.rows = len(processed_df)
+                if drifted:
+                    st.warning("This data differs from the data the model was trained on, so predictions may be "
+                               "less reliable: " + ", ".join(f"{feature} (PSI {scores['psi']:.2f}, {scores['status']})"
+                                                             for feature, scores in drifted.items()))
         
-        # --- Generate Suggestions ---
-        # Call the component to provide personalized suggestions based on predictions.
-        generate_suggestions(processed_df)
+            # --- Display Dashboard ---
+            # Call the component to visualize the data and predictions.
+            # The (upload, model) key lets the dashboard reuse figures rendered on earlier reruns.
+            with stage("dashboard_plots") as timed:
+                display_dashboard(processed_df, dataset_key=(upload_digest, model_digest))
+                timed.rows = len(processed_df)
         
+            # --- Grouped Rollups ---
+            # Fold the rows that are new to the result store into the persistent
+            # per-team/per-employee rollups and show them. Rows already stored (the
+            # same data re-uploaded, in any format) were counted when first seen.
+            with stage("rollups") as timed:
+                rollup_store = get_rollup_store()
+                if new_rows.any() and rollup_store.update(processed_df[new_rows],
+                                                          batch_id=f"{upload_digest}:{model_digest}"):
+                    rollup_store.save()
+                display_rollups(rollup_store)
+                timed.rows = int(new_rows.sum())
+
+            # --- Scored History ---
+            # Top at-risk employees and per-employee history across all uploads so far.
+            with stage("history"):
+                display_history(result_store, model_digest)
+
+            # --- Generate Suggestions ---
+            # Call the component to provide personalized suggestions based on predictions.
+            with stage("suggestions") as timed:
+                generate_suggestions(processed_df)
+                timed.rows = len(processed_df)
+
+        # --- Performance Panel ---
+        # Only shown while profiling is enabled. Cached reruns skip parse/features/predict.
+        if is_enabled():
+            with st.expander("⏱️ Performance"):
+                st.dataframe(perf_run.to_frame())
+                st.code(prometheus_text(), language="text")
+
     except pd.errors.EmptyDataError:
         st.error("The uploaded CSV file is empty. Please upload a file with data.")
     except pd.errors.ParserError:
         st.error("Could not parse the CSV file. Please ensure it is a valid CSV format.")
-    except KeyError as ke:
-        st.error(f"A required column was not found after feature creation: {ke}. "
-                "Check `create_features` output and your model's expected input features.")
+    except SchemaError as se:
+        st.error(f"The uploaded file does not match the expected data format: {se}.")
     except Exception as e:
         # Catch any other unexpected errors during processing or prediction.
         st.error(f"An unexpected error occurred: {e}")
@@ -0,0 +1,325 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from columnar_io import TableWriter, empty_frame, filter_mask, iter_table_chunks
+from drift_monitor import DriftMonitor, drift_path_for, format_summary, load_profile_for_model
+from feature_extraction import MODEL_FEATURES, RAW_DTYPES
+from feature_transformer import FeatureTransformer, load_transformer_for_model
+from ingestion import RAW_SCHEMA, iter_clean_chunks
+from instrumentation import ENV_VAR as PROFILE_ENV_VAR, is_enabled, profile_run, prometheus_text, set_enabled, set_log_path, stage
+from model_artifact import is_artifact_path, load_artifact
+from model_variants import select_variant
+from model_registry import get_model
+from rolling_features import INPUT_COLUMNS as ROLLING_INPUTS, RollingFeatureState, compute_rolling_features
+
+# --- Streaming Batch Scoring ---
+# Scores arbitrarily large exports (CSV, Parquet or Arrow/Feather, picked by file
+# extension for both input and output) with bounded memory: the input is read in
+# fixed-size chunks, each chunk goes through `create_features` and
+# `model.predict`, and the scored rows are appended to the output file before the
+# next chunk is read. Peak memory is proportional to `chunksize`, not file size.
+# Normalization statistics come from the FeatureTransformer saved next to the
+# model, so every chunk is transformed exactly as the training data was.
+#
+# With `--workers N` the chunks are scored by a pool of N processes instead
+# (feature extraction + prediction per shard), and results are written back in
+# input order. The model is loaded once in the parent and the workers are
+# forked from it, so they share that copy instead of each unpickling the file
+# (on platforms without fork, each worker loads it once in its initializer).
+# The model is never pickled per task; only the raw chunk travels to the worker.
+#
+# Usage (from the project root):
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --chunksize 500000
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --workers 16
+#   python app/batch_scoring.py activity.parquet scored.parquet --where team=Sales,Support
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --profile --profile-log perf.jsonl
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --drift-report drift.jsonl
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --quarantine rejected.csv
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --latency-budget-ms 50
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --rolling data/rolling_state.json
+
+DEFAULT_MODEL_PATH = "models/burnout_model.pkl"
+DEFAULT_CHUNKSIZE = 100_000
+SCHEMA_BY_NAME = {spec.name: spec for spec in RAW_SCHEMA}
+
+
+# Load (once per process) the model to score with: a pickled sklearn model, or a
+# compact .npz artifact (see model_artifact.py), which needs no sklearn import.
+def load_predictor(model_path):
+    if is_artifact_path(model_path):
+        return get_model(model_path, loader=load_artifact)
+    return get_model(model_path)
+
+
+# Resolve the fitted transformer to use: the statistics persisted with the model,
+# or (for models without them, or when asked to) a cheap first pass over the
+# input that reads only `screen_time_minutes`.
+def resolve_transformer(input_path, model_path=DEFAULT_MODEL_PATH, fit_on_input=False, chunksize=DEFAULT_CHUNKSIZE):
+    transformer = None
+    if not fit_on_input:
+        if is_artifact_path(model_path):
+            transformer = load_predictor(model_path).transformer
+        else:
+            transformer = load_transformer_for_model(model_path)
+    if transformer is None:
+        transformer = FeatureTransformer.fit_file(input_path, chunksize=chunksize)
+    return transformer
+
+
+# Add the model features and Predicted_Burnout_Index to one chunk of raw data.
+def score_frame(chunk, model, transformer):
+    with stage("features") as timed:
+        chunk = transformer.transform(chunk)
+        timed.rows = len(chunk)
+    with stage("predict") as timed:
+        chunk["Predicted_Burnout_Index"] = model.predict(chunk[MODEL_FEATURES])
+        timed.rows = len(chunk)
+    return chunk
+
+
+# Pull chunks from `chunks`, timing each read as the "parse" stage.
+def _timed_chunks(chunks):
+    chunks = iter(chunks)
+    while True:
+        with stage("parse") as timed:
+            chunk = next(chunks, None)
+            timed.rows = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
+# Raw input chunks. `columns`/`filters` are passed to `iter_table_chunks`
+# (projection and pushdown). With a `quarantine_path`, every chunk is parsed with
+# the declared schema and validated first (see ingestion.py): rejected rows go
+# to the quarantine file, and projection/filters apply to the valid rows.
+def _input_chunks(input_path, chunksize, columns=None, filters=None, quarantine_path=None):
+    if quarantine_path is None:
+        yield from iter_table_chunks(input_path, chunksize, columns, filters)
+        return
+    for chunk in iter_clean_chunks(input_path, quarantine_path, chunksize):
+        if filters:
+            chunk = chunk[filter_mask(chunk, filters).to_numpy()]
+        if columns is not None:
+            chunk = chunk[list(columns)]
+        if len(chunk):
+            yield chunk
+
+
+# Yield scored DataFrame chunks (features + Predicted_Burnout_Index) for an input file.
+def iter_scored_chunks(input_path, model, transformer, chunksize=DEFAULT_CHUNKSIZE, columns=None, filters=None,
+                       quarantine_path=None):
+    for chunk in _timed_chunks(_input_chunks(input_path, chunksize, columns, filters, quarantine_path)):
+        yield score_frame(chunk, model, transformer)
+
+
+# --- Multi-process Scoring ---
+# Per-worker state, populated once by `_init_worker` when the process starts.
+_worker_model = None
+_worker_transformer = None
+
+
+def _init_worker(model_path, transformer_stats):
+    global _worker_model, _worker_transformer
+    # The pool is forked where possible (see `_pool_context`), so the registry,
+    # with the model `score_file` loaded in the parent, is inherited: this is a
+    # lookup of the already loaded model, shared copy-on-write. Under `spawn`
+    # (no fork) each worker loads the model from disk here instead.
+    _worker_model = load_predictor(model_path)
+    # Parallelism comes from the pool; keep each worker's predict single-threaded
+    # even if the model was trained with n_jobs=-1.
+    if hasattr(_worker_model, "n_jobs"):
+        _worker_model.n_jobs = 1
+    _worker_transformer = FeatureTransformer.from_dict(transformer_stats)
+
+
+def _score_shard(chunk):
+    return score_frame(chunk, _worker_model, _worker_transformer)
+
+
+def _pool_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+# Same output as `iter_scored_chunks`, but chunks are scored by `workers` processes.
+# At most `max_pending` chunks are in flight, so memory stays bounded, and results
+# are yielded strictly in input order.
+def iter_scored_chunks_parallel(input_path, model_path, transformer, chunksize=DEFAULT_CHUNKSIZE,
+                                workers=2, max_pending=None, columns=None, filters=None, quarantine_path=None):
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=_init_worker,
+                             initargs=(model_path, transformer.to_dict())) as pool:
+        pending = deque()
+        for chunk in _timed_chunks(_input_chunks(input_path, chunksize, columns, filters, quarantine_path)):
+            pending.append(pool.submit(_score_shard, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Score `input_path` chunk by chunk and write the result to `output_path` incrementally.
+# `columns` restricts which input columns are read (the feature inputs must be
+# among them) and `filters` selects rows, e.g. [("team", "in", ["Sales"])].
+# With a `drift_monitor` (see drift_monitor.py) every scored chunk is also binned
+# against the training distribution, and its drift scores are appended to
+# `drift_report` as one JSON line per chunk. With a `quarantine_path`, rows that
+# fail schema validation are written there instead of being scored. With a
+# `rolling_state` (see rolling_features.py), the per-employee rolling features
+# are added to each scored chunk in input order, continuing from (and advancing)
+# that state, so a file scored in chunks, or across runs, gets the same values
+# as one scored in one go.
+# Returns the number of rows scored. With REMOTEMIND_PROFILE set, each stage is
+# timed (see instrumentation.py); with workers > 1, "features" and "predict" run
+# in the workers and are not recorded.
+def score_file(input_path, output_path, model_path=DEFAULT_MODEL_PATH, chunksize=DEFAULT_CHUNKSIZE,
+               fit_on_input=False, workers=1, columns=None, filters=None, drift_monitor=None, drift_report=None,
+               quarantine_path=None, rolling_state=None):
+    with profile_run("batch_scoring"):
+        with stage("model_load"):
+            transformer = resolve_transformer(input_path, model_path, fit_on_input, chunksize)
+            # Also loaded when scoring in workers: they inherit it (see `_init_worker`).
+            model = load_predictor(model_path)
+        if workers > 1:
+            chunks = iter_scored_chunks_parallel(input_path, model_path, transformer, chunksize, workers,
+                                                 columns=columns, filters=filters, quarantine_path=quarantine_path)
+        else:
+            chunks = iter_scored_chunks(input_path, model, transformer, chunksize, columns, filters, quarantine_path)
+
+        report_file = open(drift_report, "w") if drift_monitor is not None and drift_report else None
+        try:
+            with TableWriter(output_path) as writer:
+                for chunk in chunks:
+                    if rolling_state is not None:
+                        with stage("rolling") as timed:
+                            chunk = chunk.join(rolling_state.transform(chunk))
+                            timed.rows = len(chunk)
+                    with stage("write") as timed:
+                        writer.write(chunk)
+                        timed.rows = len(chunk)
+                    if drift_monitor is not None:
+                        with stage("drift") as timed:
+                            report = drift_monitor.update(chunk)
+                            timed.rows = len(chunk)
+                        if report_file is not None:
+                            report_file.write(json.dumps(report) + "\n")
+                if writer.rows == 0:
+                    # Nothing matched: still write the output columns (and Parquet/Arrow schema).
+                    empty = transformer.transform(empty_frame(input_path, columns, dtype=RAW_DTYPES))
+                    empty = empty.assign(Predicted_Burnout_Index=pd.Series(dtype=np.float64))
+                    if rolling_state is not None:
+                        empty = empty.join(compute_rolling_features(empty))
+                    writer.write(empty)
+        finally:
+            if report_file is not None:
+                report_file.close()
+    return writer.rows
+
+
+# Parse `--where team=Sales,Support` into [("team", "in", ["Sales", "Support"])].
+# Values of numeric schema columns (see ingestion.py) are parsed as numbers, so
+# `--where breaks_taken=3` matches the number 3 rather than the string "3".
+def parse_where(conditions):
+    filters = []
+    for condition in conditions or []:
+        name, sep, values = condition.partition("=")
+        if not sep or not name or not values:
+            raise ValueError(f"Invalid --where condition {condition!r}; expected COLUMN=VALUE[,VALUE...]")
+        filters.append((name, "in", [_where_value(name, value) for value in values.split(",")]))
+    return filters or None
+
+
+def _where_value(name, value):
+    spec = SCHEMA_BY_NAME.get(name)
+    if spec is None or not spec.is_numeric:
+        return value
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid --where value {value!r} for numeric column {name!r}") from None
+    return int(number) if number.is_integer() else number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a (large) export with the burnout model in bounded memory.")
+    parser.add_argument("input", help="Raw activity data (.csv, .parquet or .feather/.arrow) "
+                                      "with the columns of data/remote_mind_data.csv")
+    parser.add_argument("output", help="Where to write the scored data (format from the extension)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH,
+                        help=f"Pickled model or .npz artifact (default: {DEFAULT_MODEL_PATH})")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument("--fit-stats-on-input", action="store_true",
+                        help="Learn normalization statistics from the input file instead of the model's saved stats")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of scoring processes (default: 1, i.e. score in this process)")
+    parser.add_argument("--columns", help="Comma-separated input columns to read (default: all)")
+    parser.add_argument("--where", action="append", metavar="COLUMN=VALUE[,VALUE...]",
+                        help="Only score rows whose COLUMN is one of the values (repeatable, AND-ed)")
+    parser.add_argument("--latency-budget-ms", type=float,
+                        help="Score with the most accurate compact model variant that predicts one chunk within "
+                             "this budget (see model_variants.py)")
+    parser.add_argument("--quarantine", metavar="PATH",
+                        help="Validate rows against the raw data schema and write rejected rows here "
+                             "instead of scoring them")
+    parser.add_argument("--rolling", metavar="STATE_JSON",
+                        help="Add per-employee rolling features (7-day screen time mean, cumulative meeting "
+                             "minutes, break deficit streak), continuing from the state in this file if it exists "
+                             "and saving the updated state back to it")
+    parser.add_argument("--drift-report", metavar="JSONL",
+                        help="Check each chunk for drift against the model's training data, write the per-chunk "
+                             "scores here and print a summary")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Time each pipeline stage and print the totals (same as setting {PROFILE_ENV_VAR}=1)")
+    parser.add_argument("--profile-log", metavar="JSONL",
+                        help="Append the per-stage profile of the run to this file as a JSON line (implies --profile)")
+    args = parser.parse_args(argv)
+    if args.profile or args.profile_log:
+        set_enabled(True)
+    if args.profile_log:
+        set_log_path(args.profile_log)
+
+    columns = args.columns.split(",") if args.columns else None
+    try:
+        filters = parse_where(args.where)
+    except ValueError as e:
+        parser.error(str(e))
+    drift_monitor = None
+    if args.drift_report:
+        profile = load_profile_for_model(args.model)
+        if profile is None:
+            parser.error(f"No drift profile at '{drift_path_for(args.model)}'; retrain the model to create one")
+        drift_monitor = DriftMonitor(profile)
+    if args.latency_budget_ms is not None:
+        args.model, variant = select_variant(args.model, args.latency_budget_ms, rows=args.chunksize)
+        print(f"Using model variant '{variant['name']}' ({args.model}, CV R^2 {variant['r2']:.4f})")
+    rolling_state = None
+    if args.rolling:
+        if columns is not None and not set(ROLLING_INPUTS) <= set(columns):
+            parser.error(f"--rolling needs the columns {', '.join(ROLLING_INPUTS)}")
+        rolling_state = RollingFeatureState.load(args.rolling) if os.path.exists(args.rolling) else RollingFeatureState()
+    start = time.perf_counter()
+    rows = score_file(args.input, args.output, args.model, args.chunksize, args.fit_stats_on_input, args.workers,
+                      columns, filters, drift_monitor, args.drift_report, args.quarantine, rolling_state)
+    elapsed = time.perf_counter() - start
+    if rolling_state is not None:
+        rolling_state.save(args.rolling)
+    print(f"Scored {rows} rows in {elapsed:.2f}s with {args.workers} worker(s) "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec) -> {args.output}")
+    if drift_monitor is not None:
+        print(format_summary(drift_monitor.summary()))
+    if is_enabled():
+        print(prometheus_text(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import os
+
+import pandas as pd
+
+# --- Columnar Input/Output ---
+# One place to read raw activity data and write scored output in CSV, Parquet or
+# Arrow IPC (Feather v2), chosen by file extension. Readers accept a column
+# projection and row filters:
+#
+#   read_table("activity.parquet", columns=["team", "screen_time_minutes"],
+#              filters=[("team", "in", ["Sales", "Support"]), ("day_of_week", "==", "Monday")])
+#
+# Filters use pyarrow's list-of-tuples form (all conditions AND-ed; operators
+# ==, !=, <, <=, >, >=, in, not in). For Parquet they are pushed down, so row
+# groups whose min/max statistics rule them out are never read, and only the
+# projected columns are decoded. Arrow IPC files are memory-mapped and filtered
+# in Arrow. CSV has neither, so columns are still skipped while parsing but
+# filters are applied after each chunk is read.
+#
+# pyarrow is only imported when a Parquet/Arrow file is actually used.
+
+CSV_EXTENSIONS = (".csv",)
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".feather", ".arrow", ".ipc")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow files need the 'pyarrow' package: pip install pyarrow") from e
+    return pyarrow
+
+
+# Infer "csv", "parquet" or "arrow" from a path.
+def detect_format(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in CSV_EXTENSIONS:
+        return "csv"
+    if ext in PARQUET_EXTENSIONS:
+        return "parquet"
+    if ext in ARROW_EXTENSIONS:
+        return "arrow"
+    raise ValueError(f"Unsupported file type '{ext}' (expected CSV, Parquet or Arrow/Feather)")
+
+
+# Columns that must be read: the projection plus anything the filters reference.
+def _read_columns(columns, filters):
+    if columns is None:
+        return None
+    extra = [name for name, _, _ in (filters or []) if name not in columns]
+    return list(columns) + extra
+
+
+# Boolean mask of the rows of `df` that satisfy every filter (used for CSV).
+def filter_mask(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for name, op, value in filters or []:
+        column = df[name]
+        if op in ("=", "=="):
+            mask &= column == value
+        elif op == "!=":
+            mask &= column != value
+        elif op == "<":
+            mask &= column < value
+        elif op == "<=":
+            mask &= column <= value
+        elif op == ">":
+            mask &= column > value
+        elif op == ">=":
+            mask &= column >= value
+        elif op == "in":
+            mask &= column.isin(value)
+        elif op == "not in":
+            mask &= ~column.isin(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op!r}")
+    return mask
+
+
+def _apply_csv_filters(df, columns, filters):
+    if filters:
+        df = df[filter_mask(df, filters).to_numpy()]
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def _arrow_dataset(path, fmt):
+    pa = _import_pyarrow()
+    return pa.dataset.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+
+
+def _arrow_filter(filters):
+    pa = _import_pyarrow()
+    return pa.parquet.filters_to_expression(filters) if filters else None
+
+
+# Read a whole file (or a projected, filtered part of it) into a DataFrame.
+# `source` is a path or a file-like object; for file-like objects pass `fmt`
+# ("csv", "parquet" or "arrow"). `dtype` only applies to CSV, where it avoids
+# pandas type inference; Parquet and Arrow files carry their own schema.
+def read_table(source, columns=None, filters=None, dtype=None, fmt=None):
+    fmt = fmt or detect_format(source)
+    if fmt == "csv":
+        df = pd.read_csv(source, usecols=_read_columns(columns, filters), dtype=dtype)
+        return _apply_csv_filters(df, columns, filters)
+
+    pa = _import_pyarrow()
+    if fmt == "parquet":
+        table = pa.parquet.read_table(source, columns=columns, filters=filters or None)
+    else:
+        import pyarrow.feather
+
+        table = pyarrow.feather.read_table(source, columns=_read_columns(columns, filters),
+                                           memory_map=isinstance(source, (str, os.PathLike)))
+        if filters:
+            table = table.filter(_arrow_filter(filters))
+        if columns is not None:
+            table = table.select(list(columns))
+    return table.to_pandas()
+
+
+# Yield DataFrame chunks of roughly `chunksize` rows, in file order.
+# Parquet/Arrow batches follow row-group boundaries, so they can be smaller.
+def iter_table_chunks(path, chunksize=100_000, columns=None, filters=None, dtype=None):
+    fmt = detect_format(path)
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, usecols=_read_columns(columns, filters), dtype=dtype, chunksize=chunksize):
+            chunk = _apply_csv_filters(chunk, columns, filters)
+            if len(chunk):
+                yield chunk
+        return
+
+    batches = _arrow_dataset(path, fmt).to_batches(
+        columns=columns, filter=_arrow_filter(filters), batch_size=chunksize)
+    for batch in batches:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+# Zero-row DataFrame with the columns (and dtypes) of `path`. CSV has no stored
+# types, so pass `dtype` to get typed columns instead of `object`.
+def empty_frame(path, columns=None, dtype=None):
+    fmt = detect_format(path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns, nrows=0, dtype=dtype)
+    df = _arrow_dataset(path, fmt).schema.empty_table().to_pandas()
+    return df if columns is None else df[list(columns)]
+
+
+# --- Writers ---
+# Categorical columns become Arrow dictionaries, and every chunk brings its own
+# categories (and index width), which one Parquet/Arrow file schema cannot hold:
+# they are written as plain values instead (Parquet still dictionary-encodes them).
+def _decode_dictionaries(pa, table):
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    return table
+
+
+# Incremental writer: call `write(df)` once per chunk; the file is finalized on
+# close. Every chunk is cast to the schema of the first one, so all chunks of a
+# Parquet or Arrow file share one schema.
+class TableWriter:
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.format = fmt or detect_format(path)
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, df):
+        if self.format == "csv":
+            if self._file is None:
+                self._file = open(self.path, "w", newline="")
+                df.to_csv(self._file, index=False)
+            else:
+                df.to_csv(self._file, header=False, index=False)
+        else:
+            pa = _import_pyarrow()
+            table = _decode_dictionaries(pa, pa.Table.from_pandas(df, preserve_index=False))
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == "parquet":
+                    self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema)
+            elif not table.schema.equals(self._schema):
+                table = table.cast(self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        # No chunks: still leave an (empty) output file.
+        if self.format == "csv" and self._file is None and self.rows == 0:
+            open(self.path, "w").close()
+        elif self.format != "csv" and self._writer is None:
+            self.write(pd.DataFrame())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# Write a whole DataFrame in the format implied by the path.
+def write_table(df, path):
+    with TableWriter(path) as writer:
+        writer.write(df)
+    return path
@@ -2,15 +2,84 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd # Explicitly import pandas, though it's likely already in the main app
+import io
+import numpy as np
+
+from components.plot_aggregation import binned_2d, binned_histogram, binned_kde, figure_cache, frame_hash, stratified_sample
+
+# --- Large Dataset Settings ---
+# Above this many rows the scatter plots are drawn from pre-aggregated data
+# instead of one marker per row.
+LARGE_DATASET_ROWS = 20_000
+# "density": 2D-binned grid coloured by the mean hue per cell.
+# "sample":  scatter of a stratified sample of SAMPLE_ROWS rows.
+LARGE_SCATTER_MODE = "density"
+SAMPLE_ROWS = 5_000
+DENSITY_BINS = 80
+KDE_BINS = 256 # Fine bins the KDE curve is computed from
+
+
+# Render a Matplotlib figure to PNG bytes and close it (frees memory between reruns).
+def _to_png(fig):
+    plt.tight_layout() # Adjust layout to prevent labels from overlapping
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+# Histogram + KDE of a column, computed on binned data rather than every row.
+def _render_histogram(values, bins=10, color="crimson"):
+    fig, ax = plt.subplots(figsize=(10, 6)) # Set a specific figure size for better display
+    counts, edges = binned_histogram(values, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color=color, alpha=0.6, edgecolor="white")
+    fine_counts, fine_edges = binned_histogram(values, bins=KDE_BINS, value_range=(edges[0], edges[-1]))
+    grid, kde = binned_kde(fine_counts, fine_edges, scale_bin_width=edges[1] - edges[0])
+    ax.plot(grid, kde, color=color)
+    ax.set_title("Distribution of Predicted Burnout Index") # Add a title to the plot
+    ax.set_xlabel("Predicted Burnout Index") # Label the x-axis
+    ax.set_ylabel("Frequency") # Label the y-axis
+    return _to_png(fig)
+
+
+# Scatter plot of y against x coloured by hue. Small data is plotted point by
+# point; large data as a 2D-binned density grid or a stratified sample.
+def _render_scatter(df, x, y, hue, palette, title, xlabel, max_rows, mode):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if len(df) <= max_rows:
+        sns.scatterplot(data=df, x=x, y=y, hue=hue, palette=palette, ax=ax)
+    elif mode == "sample":
+        sample = stratified_sample(df[[x, y, hue]], hue, SAMPLE_ROWS)
+        sns.scatterplot(data=sample, x=x, y=y, hue=hue, palette=palette, ax=ax, s=10, linewidth=0)
+        title += f" - stratified sample of {len(sample):,} of {len(df):,} rows"
+    else:
+        counts, x_edges, y_edges, hue_means = binned_2d(df[x], df[y], df[hue], bins=DENSITY_BINS)
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_invalid(hue_means).T, cmap=palette, shading="flat")
+        fig.colorbar(mesh, ax=ax, label=f"Mean {hue}")
+        title += f" - binned, {len(df):,} rows"
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Predicted Burnout Index")
+    return _to_png(fig)
 
 # --- Function to Display Dashboard Insights ---
 # This function takes a DataFrame (df) which is expected to contain
 # processed data, including the 'Predicted_Burnout_Index' (previously 'Predicted_Stress_Level')
 # and other relevant features like 'Cognitive_Load_Index', 'Video_Call_Score', and 'Break_Efficiency'.
-def display_dashboard(df: pd.DataFrame):
+#
+# Figures are pre-aggregated (binned histogram/KDE, binned or sampled scatter
+# above `max_scatter_rows`) and cached as PNGs per dataset hash, so reruns and
+# large uploads stay interactive. Pass `dataset_key` (e.g. the upload hash) to
+# skip hashing the frame.
+def display_dashboard(df: pd.DataFrame, dataset_key=None, max_scatter_rows=LARGE_DATASET_ROWS,
+                      scatter_mode=LARGE_SCATTER_MODE):
     # Set a subheader for the dashboard section in the Streamlit app.
     st.subheader("📊 Dashboard Insights")
 
+    if dataset_key is None:
+        dataset_key = frame_hash(df)
+    render_settings = (dataset_key, max_scatter_rows, scatter_mode)
+
     # --- Display Key Metrics ---
     # st.metric displays a key-value pair, useful for showing single, important numbers.
     # We use .mean() and .max() to get aggregate statistics for the predicted stress and cognitive load.
@@ -36,68 +105,43 @@ def display_dashboard(df: pd.DataFrame):
 
     # --- Stress Level Distribution Plot ---
     st.write("### Burnout Index Distribution")
-    # Create a Matplotlib figure and an axes object for the plot.
-    fig, ax = plt.subplots(figsize=(10, 6)) # Set a specific figure size for better display
-    
-    # Use Seaborn's histplot to visualize the distribution of predicted burnout index.
-    # kde=True adds a Kernel Density Estimate curve for smoother distribution visualization.
-    # bins=10 sets the number of bins for the histogram.
-    # ax=ax specifies that the plot should be drawn on our created axes.
-    # color="crimson" sets the color of the histogram bars.
+    # Histogram (10 bins) with a KDE curve, like seaborn's histplot(kde=True),
+    # but both computed from binned counts so the cost does not depend on row count.
     if "Predicted_Burnout_Index" in df.columns:
-        sns.histplot(df["Predicted_Burnout_Index"], kde=True, bins=10, ax=ax, color="crimson")
-        ax.set_title("Distribution of Predicted Burnout Index") # Add a title to the plot
-        ax.set_xlabel("Predicted Burnout Index") # Label the x-axis
-        ax.set_ylabel("Frequency") # Label the y-axis
-        plt.tight_layout() # Adjust layout to prevent labels from overlapping
-        st.pyplot(fig) # Display the Matplotlib figure in Streamlit.
-        plt.close(fig) # Close the figure to free up memory (important for Streamlit apps).
+        png = figure_cache.get_or_render(
+            ("histogram",) + render_settings,
+            lambda: _render_histogram(df["Predicted_Burnout_Index"]))
+        st.image(png) # Display the rendered figure in Streamlit.
     else:
         st.info("Cannot display Burnout Index Distribution: 'Predicted_Burnout_Index' column is missing.")
 
 
     # --- Cognitive Load vs Predicted Burnout Plot ---
     st.write("### Cognitive Load vs Predicted Burnout Index")
-    # Create another Matplotlib figure and axes for this scatter plot.
-    fig2, ax2 = plt.subplots(figsize=(10, 6))
-    
-    # Use Seaborn's scatterplot to show the relationship between Cognitive Load Index
-    # and Predicted Burnout Index.
-    # hue="Break_Efficiency" colors the points based on 'Break_Efficiency',
-    # allowing us to see if break efficiency influences this relationship.
-    # palette="coolwarm" sets the color scheme for the hue.
+    # Show the relationship between Cognitive Load Index and Predicted Burnout Index,
+    # coloured by 'Break_Efficiency' to see if break efficiency influences it.
     if "Cognitive_Load_Index" in df.columns and "Predicted_Burnout_Index" in df.columns and "Break_Efficiency" in df.columns:
-        sns.scatterplot(data=df, x="Cognitive_Load_Index", y="Predicted_Burnout_Index",
-                        hue="Break_Efficiency", palette="coolwarm", ax=ax2)
-        ax2.set_title("Cognitive Load vs Predicted Burnout Index (by Break Efficiency)")
-        ax2.set_xlabel("Cognitive Load Index")
-        ax2.set_ylabel("Predicted Burnout Index")
-        plt.tight_layout()
-        st.pyplot(fig2)
-        plt.close(fig2)
+        png = figure_cache.get_or_render(
+            ("cognitive_load",) + render_settings,
+            lambda: _render_scatter(df, "Cognitive_Load_Index", "Predicted_Burnout_Index", "Break_Efficiency",
+                                    "coolwarm", "Cognitive Load vs Predicted Burnout Index (by Break Efficiency)",
+                                    "Cognitive Load Index", max_scatter_rows, scatter_mode))
+        st.image(png)
     else:
         st.info("Cannot display Cognitive Load vs Predicted Burnout: One or more required columns are missing.")
 
 
     # --- Video Call Score vs Predicted Burnout Plot ---
     st.write("### Video Call Score vs Predicted Burnout Index")
-    # Create the third Matplotlib figure and axes.
-    fig3, ax3 = plt.subplots(figsize=(10, 6))
-    
-    # Similar to the previous scatter plot, visualize the relationship between
-    # Video Call Score and Predicted Burnout Index.
-    # We can use 'Break_Efficiency' as hue again, or choose another relevant feature
-    # like 'Average_Screen_Time_Hours' if it makes sense for visual analysis.
-    # For now, let's use 'Average_Screen_Time_Hours' to show another dimension.
+    # Similar to the previous plot, coloured by 'Average_Screen_Time_Hours'
+    # to show another dimension.
     if "Video_Call_Score" in df.columns and "Predicted_Burnout_Index" in df.columns and "Average_Screen_Time_Hours" in df.columns:
-        sns.scatterplot(data=df, x="Video_Call_Score", y="Predicted_Burnout_Index",
-                        hue="Average_Screen_Time_Hours", palette="viridis", ax=ax3) # Using 'viridis' palette
-        ax3.set_title("Video Call Score vs Predicted Burnout Index (by Avg Screen Time)")
-        ax3.set_xlabel("Video Call Score")
-        ax3.set_ylabel("Predicted Burnout Index")
-        plt.tight_layout()
-        st.pyplot(fig3)
-        plt.close(fig3)
+        png = figure_cache.get_or_render(
+            ("video_call",) + render_settings,
+            lambda: _render_scatter(df, "Video_Call_Score", "Predicted_Burnout_Index", "Average_Screen_Time_Hours",
+                                    "viridis", "Video Call Score vs Predicted Burnout Index (by Avg Screen Time)",
+                                    "Video Call Score", max_scatter_rows, scatter_mode))
+        st.image(png)
     else:
         st.info("Cannot display Video Call Score vs Predicted Burnout: One or more required columns are missing.")
 
@@ -105,7 +149,45 @@ def display_dashboard(df: pd.DataFrame):
     # or feature distributions relevant to burnout.
     # Example:
     # st.write("### Break Efficiency Distribution")
-    # fig4, ax4 = plt.subplots()
-    # sns.histplot(df["Break_Efficiency"], kde=True, bins=10, ax=ax4, color="teal")
-    # st.pyplot(fig4)
-    # plt.close(fig4)
\ No newline at end of file
+    # png = figure_cache.get_or_render(("break_efficiency",) + render_settings,
+    #                                  lambda: _render_histogram(df["Break_Efficiency"], color="teal"))
+    # st.image(png)
+
+
+# --- Function to Display Grouped Rollups ---
+# Shows per-team / per-employee (etc.) burnout aggregates answered from the
+# incremental rollup store (app/rollup_store.py), covering every batch scored
+# so far rather than only the current upload.
+def display_rollups(store):
+    st.subheader("👥 Burnout by Group (all scored data)")
+
+    overall = store.overall()
+    if overall is None:
+        st.info("No scored data has been added to the rollup store yet.")
+        return
+    st.write(f"{int(overall['count']):,} scored rows from {len(store.batches)} batch(es).")
+
+    labels = {"team": "Team", "employee_id": "Employee", "country": "Country", "day_of_week": "Day of week"}
+    dimension = st.selectbox("Group by", store.dimensions, format_func=lambda d: labels.get(d, d))
+    top_n = st.slider("Show top groups by mean burnout", min_value=5, max_value=100, value=10, step=5)
+    st.dataframe(store.top(dimension, n=top_n).round(2))
+
+
+# --- Scored History ---
+# Reads the persistent result store (see result_store.py) with indexed queries:
+# the top-N at-risk employees and one employee's scores over time.
+def display_history(store, model):
+    st.subheader("📈 Scored History")
+
+    orderings = {"last": "Latest score", "mean": "Mean score"}
+    by = st.selectbox("Rank employees by", list(orderings), format_func=orderings.get)
+    top_n = st.slider("Top at-risk employees", min_value=5, max_value=100, value=10, step=5)
+    top = store.top_at_risk(model, n=top_n, by=by)
+    if top.empty:
+        st.info("No scored history yet.")
+        return
+    st.dataframe(top.round(2))
+
+    employee_id = st.selectbox("Employee history", top["employee_id"].tolist())
+    history = store.history(employee_id=employee_id, model=model)
+    st.dataframe(history.round(2))
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- Server-side Plot Aggregation ---
+# Helpers that reduce a large scored DataFrame to a small, fixed-size summary
+# before anything is handed to Matplotlib, so rendering cost no longer grows
+# with the number of rows.
+
+
+# Stable hash of the columns a plot depends on (used as a render-cache key).
+def frame_hash(df: pd.DataFrame, columns=None) -> str:
+    subset = df if columns is None else df[[c for c in columns if c in df.columns]]
+    hashed = pd.util.hash_pandas_object(subset, index=False).to_numpy()
+    digest = hashlib.sha256(hashed.tobytes())
+    digest.update(",".join(map(str, subset.columns)).encode())
+    return digest.hexdigest()
+
+
+# Histogram counts and bin edges of the finite values.
+def binned_histogram(values, bins=10, value_range=None):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    return np.histogram(values, bins=bins, range=value_range)
+
+
+# Gaussian KDE evaluated from histogram counts instead of raw points.
+# With a few hundred fine bins the result is visually identical to a KDE over
+# every row, but costs O(bins * grid_points) instead of O(rows * grid_points).
+# Scaled to counts per `scale_bin_width`, so it overlays a histogram with that
+# bin width (as seaborn does for histplot(kde=True)).
+def binned_kde(counts, edges, grid_points=200, bandwidth=None, scale_bin_width=None):
+    centers = (edges[:-1] + edges[1:]) / 2
+    total = counts.sum()
+    grid = np.linspace(edges[0], edges[-1], grid_points)
+    if total == 0:
+        return grid, np.zeros_like(grid)
+
+    if bandwidth is None:
+        # Scott's rule on the binned data.
+        mean = np.average(centers, weights=counts)
+        std = np.sqrt(np.average((centers - mean) ** 2, weights=counts))
+        bandwidth = max(std, edges[1] - edges[0]) * total ** (-1 / 5)
+
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) * counts).sum(axis=1) / (total * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density * total * (scale_bin_width or 1.0)
+
+
+# 2D-binned density of (x, y) plus the mean of `hue` in each cell (NaN where empty).
+def binned_2d(x, y, hue=None, bins=80):
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if hue is not None:
+        hue = np.asarray(hue, dtype=np.float64)
+        finite &= np.isfinite(hue)
+    x, y = x[finite], y[finite]
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    if hue is None:
+        return counts, x_edges, y_edges, None
+    hue_sums, _, _ = np.histogram2d(x, y, bins=[x_edges, y_edges], weights=hue[finite])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hue_means = np.where(counts > 0, hue_sums / counts, np.nan)
+    return counts, x_edges, y_edges, hue_means
+
+
+# Sample up to `n` rows, proportionally from each quantile band of `strata_column`
+# so the tails of the hue distribution stay represented.
+def stratified_sample(df: pd.DataFrame, strata_column, n, n_strata=10, seed=0):
+    if len(df) <= n:
+        return df
+    strata = pd.qcut(df[strata_column].rank(method="first"), q=n_strata, labels=False)
+    fraction = n / len(df)
+    return df.groupby(strata, group_keys=False, observed=True).sample(frac=fraction, random_state=seed)
+
+
+# --- Rendered Figure Cache ---
+# Small LRU cache of rendered figures (PNG bytes) keyed by dataset hash and plot
+# settings, so Streamlit reruns on the same data skip Matplotlib entirely.
+class FigureCache:
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Shared by every Streamlit session thread, like PredictionCache.
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Rendering happens outside the lock, so one slow figure does not block other sessions.
+    def get_or_render(self, key, render):
+        png = self.get(key)
+        if png is None:
+            png = render()
+            self.put(key, png)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+figure_cache = FigureCache()
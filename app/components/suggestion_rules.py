@@ -0,0 +1,72 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+# --- Vectorized Suggestion Rules ---
+# Each rule is a threshold test on one feature column. All rules are evaluated
+# over the whole frame as boolean masks and packed into one small integer per
+# row (bit i set = rule i fired), so millions of rows cost a handful of NumPy
+# operations and a few bytes each. Suggestion text is only produced for the
+# rows actually being displayed.
+
+
+class SuggestionRule:
+    def __init__(self, name, column, op, threshold, text):
+        self.name = name
+        self.column = column
+        self.op = op
+        self.threshold = threshold
+        self.text = text
+
+
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# Bit i of a suggestion code corresponds to DEFAULT_RULES[i]; at most 16 rules.
+DEFAULT_RULES = [
+    SuggestionRule("high_video_calls", "Video_Call_Score", ">=", 0.85,
+                   "High video call load: try reducing non-essential video meetings or switching some to async updates."),
+    SuggestionRule("low_break_efficiency", "Break_Efficiency", "<", 0.005,
+                   "Few breaks for the time on screen: schedule a short break every hour."),
+    SuggestionRule("long_screen_time", "Average_Screen_Time_Hours", ">", 8.5,
+                   "Long screen days: plan screen-free time right after work."),
+    SuggestionRule("high_cognitive_load", "Cognitive_Load_Index", ">", 200,
+                   "Elevated cognitive load: batch similar tasks and protect blocks of focused work."),
+]
+
+
+# Evaluate every rule over `df` and return one uint16 suggestion code per row.
+# Rules whose column is missing never fire; NaN values never fire either.
+def evaluate_rules(df: pd.DataFrame, rules=DEFAULT_RULES):
+    if len(rules) > 16:
+        raise ValueError("At most 16 suggestion rules fit in a uint16 code.")
+    codes = np.zeros(len(df), dtype=np.uint16)
+    for bit, rule in enumerate(rules):
+        if rule.column not in df.columns:
+            continue
+        mask = _OPS[rule.op](df[rule.column].to_numpy(), rule.threshold)
+        codes |= mask.astype(np.uint16) << np.uint16(bit)
+    return codes
+
+
+# Number of rows each rule fired for, as a Series indexed by rule name.
+def count_rule_hits(codes, rules=DEFAULT_RULES):
+    bits = np.arange(len(rules), dtype=np.uint16)
+    hits = np.array([np.count_nonzero(codes & (np.uint16(1) << bit)) for bit in bits], dtype=np.int64)
+    return pd.Series(hits, index=[rule.name for rule in rules])
+
+
+# Suggestion texts for a single code.
+def decode(code, rules=DEFAULT_RULES):
+    return [rule.text for bit, rule in enumerate(rules) if int(code) >> bit & 1]
+
+
+# Positions of the `n` largest `values` (unordered
+# selection, then a sort of just those n rows).
+def top_rows(values, n):
+    values = np.asarray(values)
+    n = min(n, len(values))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-values, n - 1)[:n]
+    return candidates[np.argsort(-values[candidates], kind="stable")]
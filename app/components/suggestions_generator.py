@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd # Explicitly import pandas for type hinting
 
+from components.suggestion_rules import DEFAULT_RULES, count_rule_hits, decode, evaluate_rules, top_rows
+
+# Number of highest-risk rows shown with their individual suggestions.
+MAX_DISPLAYED_ROWS = 10
+
 # --- Function to Generate AI-Powered Wellness Suggestions ---
 # This function takes a DataFrame (df) that should include
 # the 'Predicted_Burnout_Index' column (as renamed from 'Predicted_Stress_Level'
@@ -64,10 +69,19 @@ def generate_suggestions(df: pd.DataFrame):
     if avg_screen_time > df["Average_Screen_Time_Hours"].median() * 1.5: # Example threshold
         st.write(f"- Your average daily screen time ({avg_screen_time:.2f} hours) is on the higher side. Try incorporating screen-free activities or using blue light filters.")
 
-    # You could also show suggestions based on specific feature values for individual data points
-    # (e.g., if you had an ID for each person/period):
-    # for index, row in high_risk_entries.iterrows():
-    #     st.write(f"--- Recommendations for Data Point/Individual ID {index} (Burnout: {row['Predicted_Burnout_Index']:.2f}) ---")
-    #     if row['Video_Call_Score'] > X_train['Video_Call_Score'].mean(): # Compare to training data mean
-    #         st.write("- High video call score detected. Try reducing non-essential video meetings.")
-    #     # ... and so on for other features
\ No newline at end of file
+    # --- Per-row Suggestions ---
+    # Evaluate all threshold rules over every row at once (one small bitmask code
+    # per row), then render text only for the highest-risk rows on display.
+    codes = evaluate_rules(df, DEFAULT_RULES)
+    hits = count_rule_hits(codes, DEFAULT_RULES)
+    if hits.any():
+        st.write("**Rows flagged by each rule:**")
+        st.dataframe(hits[hits > 0].rename("rows").to_frame())
+
+    st.write(f"**Individual suggestions for the {min(MAX_DISPLAYED_ROWS, len(df))} highest predicted burnout rows:**")
+    for position in top_rows(df["Predicted_Burnout_Index"].to_numpy(), MAX_DISPLAYED_ROWS):
+        row = df.iloc[position]
+        label = row["employee_id"] if "employee_id" in df.columns else f"Row {df.index[position]}"
+        texts = decode(codes[position], DEFAULT_RULES)
+        st.write(f"- **{label}** (Burnout: {row['Predicted_Burnout_Index']:.2f}): "
+                 + (" ".join(texts) if texts else "No specific risk factors flagged."))
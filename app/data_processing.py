@@ -1,6 +1,10 @@
 from feature_extraction import create_features
-import pandas as pd
+from columnar_io import read_table, write_table
 
-data= pd.read_csv(r"data\remote_mind_data.csv")
-data=create_features(data)
+data = read_table("data/remote_mind_data.csv")
+data = create_features(data)
 print(data.head())
+
+# Cache the processed features in columnar form; src/model.py reads only the
+# columns it needs from it instead of re-parsing a CSV.
+write_table(data, "data/remote_mind_data_processed2.parquet")
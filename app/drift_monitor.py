@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from columnar_io import iter_table_chunks, read_table
+from feature_extraction import MODEL_FEATURES
+from feature_transformer import FeatureTransformer, load_transformer_for_model
+
+# --- Input Drift Monitor ---
+# At training time each model feature is summarized by a fixed-bin histogram
+# whose edges are the training quantiles (so every bin holds roughly the same
+# share of training rows), plus open-ended tail bins and a missing-value count.
+# The reference histograms are saved next to the model:
+#   models/burnout_model.pkl -> models/burnout_model.drift.json
+#
+# While scoring, each batch is binned with the same edges. Only the counts are
+# kept, so memory is O(features x bins) however many rows are scored, and the
+# raw data never has to be kept or re-read. For every batch (and cumulatively)
+# we report, per feature:
+#   PSI - population stability index, sum((p - q) * ln(p / q)) over the bins;
+#         < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift.
+#   KS  - the largest gap between the reference and observed CDFs, evaluated
+#         at the bin edges (a binned Kolmogorov-Smirnov statistic).
+# Scores of small batches are noisy; use a chunk size of thousands of rows, or
+# read the cumulative summary.
+#
+# Usage (from the project root):
+#   python app/drift_monitor.py data/new_activity.csv
+#   python app/batch_scoring.py data/new_activity.csv scored.csv --drift-report drift.jsonl
+
+PROFILE_VERSION = 1
+DEFAULT_BINS = 20
+# Small training sets get fewer bins, so each reference bin has enough rows to be stable.
+MIN_ROWS_PER_BIN = 10
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Floor applied to bin shares in the PSI, so empty bins do not give infinities.
+PSI_EPSILON = 1e-4
+
+
+def drift_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".drift.json"
+
+
+def psi(expected, actual):
+    p = np.maximum(expected / max(expected.sum(), 1), PSI_EPSILON)
+    q = np.maximum(actual / max(actual.sum(), 1), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def binned_ks(expected, actual):
+    p = np.cumsum(expected) / max(expected.sum(), 1)
+    q = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(p - q)))
+
+
+def drift_status(psi_value):
+    if psi_value >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi_value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+# Fixed-edge histogram of one feature: len(edges) + 1 bins (the first and last
+# are the open tails) plus a count of missing values.
+class FeatureSketch:
+    def __init__(self, edges, counts=None, missing=0):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None \
+            else np.asarray(counts, dtype=np.int64)
+        self.missing = int(missing)
+
+    @classmethod
+    def from_values(cls, values, n_bins=DEFAULT_BINS):
+        values = np.asarray(values, dtype=np.float64)
+        finite = values[~np.isnan(values)]
+        if len(finite) == 0:
+            edges = np.empty(0)
+        else:
+            n_bins = max(2, min(n_bins, len(finite) // MIN_ROWS_PER_BIN))
+            edges = np.unique(np.quantile(finite, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        sketch = cls(edges)
+        sketch.update(values)
+        return sketch
+
+    @property
+    def n_rows(self):
+        return int(self.counts.sum()) + self.missing
+
+    def empty_like(self):
+        return FeatureSketch(self.edges)
+
+    # Count `values` into the bins; returns the per-bin counts of this batch alone.
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        nan = np.isnan(values)
+        n_missing = int(nan.sum())
+        if n_missing:
+            values = values[~nan]
+        batch = np.bincount(np.searchsorted(self.edges, values, side="right"), minlength=len(self.counts))
+        self.counts += batch
+        self.missing += n_missing
+        return batch
+
+    def to_dict(self):
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist(), "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["edges"], data["counts"], data["missing"])
+
+
+# Reference sketches of the model features, built from the training data.
+class DriftProfile:
+    def __init__(self, sketches):
+        self.sketches = sketches
+
+    @property
+    def features(self):
+        return list(self.sketches)
+
+    @classmethod
+    def from_frame(cls, data, features=MODEL_FEATURES, n_bins=DEFAULT_BINS):
+        return cls({feature: FeatureSketch.from_values(data[feature].to_numpy(), n_bins) for feature in features})
+
+    def to_dict(self):
+        return {"version": PROFILE_VERSION,
+                "features": {feature: sketch.to_dict() for feature, sketch in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported drift profile version: {data.get('version')!r}")
+        return cls({feature: FeatureSketch.from_dict(sketch) for feature, sketch in data["features"].items()})
+
+    def save(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.to_dict(), fh)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+
+# Load the drift profile saved alongside `model_path`, or None if there is none.
+def load_profile_for_model(model_path):
+    path = drift_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    return DriftProfile.load(path)
+
+
+# Bins scored batches against a reference profile and reports drift per batch
+# and for everything seen so far.
+class DriftMonitor:
+    def __init__(self, profile):
+        self.profile = profile
+        self.observed = {feature: sketch.empty_like() for feature, sketch in profile.sketches.items()}
+        self.batches = 0
+
+    def _scores(self, feature, counts, n_missing):
+        reference = self.profile.sketches[feature]
+        score = psi(reference.counts, counts)
+        return {
+            "rows": int(counts.sum()) + n_missing,
+            "missing": n_missing,
+            "psi": round(score, 6),
+            "ks": round(binned_ks(reference.counts, counts), 6),
+            "status": drift_status(score),
+        }
+
+    # Fold a batch of feature values (a DataFrame with the model feature columns)
+    # into the running sketches and return the drift scores of this batch.
+    def update(self, data):
+        report = {"batch": self.batches, "features": {}}
+        for feature, sketch in self.observed.items():
+            values = data[feature].to_numpy()
+            missing_before = sketch.missing
+            counts = sketch.update(values)
+            report["features"][feature] = self._scores(feature, counts, sketch.missing - missing_before)
+        self.batches += 1
+        return report
+
+    # Drift scores over all batches seen so far.
+    def summary(self):
+        return {
+            "batches": self.batches,
+            "features": {feature: self._scores(feature, sketch.counts, sketch.missing)
+                         for feature, sketch in self.observed.items()},
+        }
+
+
+def format_summary(summary):
+    lines = [f"{'feature':28s} {'rows':>10s} {'PSI':>8s} {'KS':>7s}  status"]
+    for feature, scores in summary["features"].items():
+        lines.append(f"{feature:28s} {scores['rows']:>10d} {scores['psi']:8.4f} {scores['ks']:7.4f}  {scores['status']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check raw activity data for drift against the model's training data.")
+    parser.add_argument("input", help="Raw activity data (.csv, .parquet or .feather/.arrow)")
+    parser.add_argument("--model", default="models/burnout_model.pkl")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--build-from", metavar="PROCESSED",
+                        help="(Re)build the model's drift profile from this processed training file first")
+    args = parser.parse_args(argv)
+
+    if args.build_from:
+        DriftProfile.from_frame(read_table(args.build_from, columns=MODEL_FEATURES)).save(drift_path_for(args.model))
+        print(f"Drift profile saved to '{drift_path_for(args.model)}'")
+
+    profile = load_profile_for_model(args.model)
+    if profile is None:
+        parser.error(f"No drift profile at '{drift_path_for(args.model)}'; retrain or pass --build-from")
+    # Models saved without normalization statistics: learn them from the input
+    # first, as batch_scoring.py does.
+    transformer = load_transformer_for_model(args.model)
+    if transformer is None:
+        print(f"No feature statistics saved with '{args.model}'; fitting them on the input.")
+        transformer = FeatureTransformer.fit_file(args.input, chunksize=args.chunksize)
+    monitor = DriftMonitor(profile)
+    for chunk in iter_table_chunks(args.input, args.chunksize):
+        monitor.update(transformer.transform(chunk))
+    print(format_summary(monitor.summary()))
+
+
+if __name__ == "__main__":
+    main()
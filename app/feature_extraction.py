@@ -1,20 +1,95 @@
+import numpy as np
 import pandas as pd 
 
-def create_features(data):
-    # Normalize Video_Call_Minutes to a 0-1 scale
-    data["Video_Call_Score"] = data["screen_time_minutes"] / data["screen_time_minutes"].max()
+# The four engineered features the burnout model is trained on, in training order.
+MODEL_FEATURES = ["Video_Call_Score", "Break_Efficiency", "Average_Screen_Time_Hours", "Cognitive_Load_Index"]
+
+# Raw columns the features are computed from.
+FEATURE_INPUT_COLUMNS = ["screen_time_minutes", "breaks_taken"]
+
+# Compact dtypes for the raw activity schema (data/remote_mind_data.csv).
+# Counts and minutes are whole numbers well below 2**24, so float32 holds them
+# exactly; low-cardinality text columns are stored as categoricals.
+RAW_DTYPES = {
+    "employee_id": "category",
+    "team": "category",
+    "country": "category",
+    "screen_time_minutes": np.float32,
+    "breaks_taken": np.float32,
+    "meetings_attended": np.float32,
+    "average_meeting_duration": np.float32,
+    "typing_speed_wpm": np.float32,
+    "day_of_week": "category",
+    "reported_stress_level": np.float32,
+    "burnout_index": np.float32,
+}
+
+def create_features(data, screen_time_max=None):
+    # Work in float64 whatever the input dtypes are (e.g. compact float32 columns
+    # read with RAW_DTYPES), so the features always match what the model was trained on.
+    screen_time = data["screen_time_minutes"].astype(np.float64)
+    breaks = data["breaks_taken"].astype(np.float64)
+
+    # Normalize Video_Call_Minutes to a 0-1 scale.
+    # `screen_time_max` lets callers that only see part of the data (e.g. chunked
+    # scoring) pass in the whole-dataset maximum so every chunk is scaled the same way.
+    if screen_time_max is None:
+        screen_time_max = screen_time.max()
+    data["Video_Call_Score"] = screen_time / screen_time_max
 
     # Breaks per hour of screen time (Avoid division by zero)
-    data["Break_Efficiency"] = data["breaks_taken"] / (data["screen_time_minutes"] + 1e-3)
+    data["Break_Efficiency"] = breaks / (screen_time + 1e-3)
 
     # Calculate the average screen time in hours
-    data["Average_Screen_Time_Hours"] = data["screen_time_minutes"] / 60
+    data["Average_Screen_Time_Hours"] = screen_time / 60
 
     # Composite Burnout Indicator (just for experimentation)
     data["Cognitive_Load_Index"] = (
-        0.4 * data["screen_time_minutes"] +
+        0.4 * screen_time +
         0.3 * data["Video_Call_Score"] -
         0.2 * data["Break_Efficiency"]
     )
 
-    return data
\ No newline at end of file
+    return data
+
+
+
+# --- Vectorized Feature Matrix ---
+# Read only the columns the features need, with compact dtypes and no type inference.
+def read_feature_inputs(path_or_buffer, **read_csv_kwargs):
+    return pd.read_csv(path_or_buffer, usecols=FEATURE_INPUT_COLUMNS,
+                       dtype={c: RAW_DTYPES[c] for c in FEATURE_INPUT_COLUMNS}, **read_csv_kwargs)
+
+
+# Compute all four model features straight into one preallocated (n_rows, 4)
+# matrix (columns in MODEL_FEATURES order) without copying or mutating the input
+# frame. Every operation writes into a column of the output, so the only memory
+# allocated is the result itself. The arithmetic is carried out in float64 in
+# the same order as `create_features`, so the values are identical to it.
+# The matrix is Fortran-ordered so each feature column is contiguous. With
+# dtype=np.float32 intermediates are rounded to float32 (within one ulp).
+def create_feature_matrix(data, screen_time_max=None, dtype=np.float64, out=None):
+    screen_time = np.asarray(data["screen_time_minutes"])
+    breaks = np.asarray(data["breaks_taken"])
+    if screen_time_max is None:
+        screen_time_max = screen_time.max()
+
+    if out is None:
+        out = np.empty((len(screen_time), len(MODEL_FEATURES)), dtype=dtype, order="F")
+    video_call, break_eff, screen_hours, cognitive_load = (out[:, i] for i in range(len(MODEL_FEATURES)))
+    calc = dict(dtype=np.float64, casting="unsafe")
+
+    np.divide(screen_time, screen_time_max, out=video_call, **calc)
+    np.add(screen_time, 1e-3, out=break_eff, **calc)
+    np.divide(breaks, break_eff, out=break_eff, **calc)
+
+    # 0.4 * screen_time + 0.3 * video_call - 0.2 * break_eff, using the
+    # screen-hours column as scratch space before filling it in.
+    np.multiply(screen_time, 0.4, out=cognitive_load, **calc)
+    np.multiply(video_call, 0.3, out=screen_hours, **calc)
+    np.add(cognitive_load, screen_hours, out=cognitive_load, **calc)
+    np.multiply(break_eff, 0.2, out=screen_hours, **calc)
+    np.subtract(cognitive_load, screen_hours, out=cognitive_load, **calc)
+
+    np.divide(screen_time, 60, out=screen_hours, **calc)
+    return out
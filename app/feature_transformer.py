@@ -0,0 +1,129 @@
+import json
+import os
+
+import numpy as np
+
+from columnar_io import iter_table_chunks
+from feature_extraction import MODEL_FEATURES, create_feature_matrix, create_features
+
+# --- Fitted Feature Transformer ---
+# `create_features` normalizes Video_Call_Score by the maximum screen time of
+# whatever frame it is handed, so a chunk, a shard or a single row would each be
+# scaled differently. The transformer learns that whole-dataset statistic once
+# (from the training data, or from a cheap first pass over a large file), is
+# persisted next to the model, and then transforms any slice of data identically.
+
+STATS_VERSION = 1
+
+
+class NotFittedError(ValueError):
+    pass
+
+
+class FeatureTransformer:
+    def __init__(self, screen_time_max=None, screen_time_min=None, n_rows=0):
+        self.screen_time_max = screen_time_max
+        self.screen_time_min = screen_time_min
+        self.n_rows = n_rows
+
+    @property
+    def is_fitted(self):
+        return self.screen_time_max is not None
+
+    # Fold the statistics of one chunk of raw data into the running statistics.
+    def partial_fit(self, data):
+        screen_time = data["screen_time_minutes"]
+        if len(screen_time) == 0:
+            return self
+        chunk_max, chunk_min = float(screen_time.max()), float(screen_time.min())
+        self.screen_time_max = chunk_max if self.screen_time_max is None else max(self.screen_time_max, chunk_max)
+        self.screen_time_min = chunk_min if self.screen_time_min is None else min(self.screen_time_min, chunk_min)
+        self.n_rows += len(screen_time)
+        return self
+
+    # Learn the statistics from a full DataFrame (discarding any previous fit).
+    def fit(self, data):
+        self.screen_time_max = self.screen_time_min = None
+        self.n_rows = 0
+        return self.partial_fit(data)
+
+    # Combine the statistics of a transformer fitted on another part of the data
+    # (e.g. by a worker process) into this one.
+    def merge(self, other):
+        if not other.is_fitted:
+            return self
+        if not self.is_fitted:
+            self.screen_time_max, self.screen_time_min = other.screen_time_max, other.screen_time_min
+        else:
+            self.screen_time_max = max(self.screen_time_max, other.screen_time_max)
+            self.screen_time_min = min(self.screen_time_min, other.screen_time_min)
+        self.n_rows += other.n_rows
+        return self
+
+    # First pass over a (possibly huge) CSV/Parquet/Arrow file, reading only the
+    # column the statistics need.
+    @classmethod
+    def fit_file(cls, path, chunksize=100_000):
+        transformer = cls()
+        for chunk in iter_table_chunks(path, chunksize, columns=["screen_time_minutes"]):
+            transformer.partial_fit(chunk)
+        return transformer
+
+    # Add the model features to `data` using the fitted statistics.
+    # Works the same on a full dataset, a chunk or a single row.
+    def transform(self, data):
+        if not self.is_fitted:
+            raise NotFittedError("FeatureTransformer must be fitted (or loaded) before calling transform().")
+        return create_features(data, screen_time_max=self.screen_time_max)
+
+    # Same features as `transform`, but returned as a preallocated (n_rows, 4)
+    # matrix without touching `data`; only the raw input columns are read.
+    def transform_matrix(self, data, dtype=np.float64, out=None):
+        if not self.is_fitted:
+            raise NotFittedError("FeatureTransformer must be fitted (or loaded) before calling transform_matrix().")
+        return create_feature_matrix(data, screen_time_max=self.screen_time_max, dtype=dtype, out=out)
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    # --- Persistence ---
+    def to_dict(self):
+        return {
+            "version": STATS_VERSION,
+            "features": MODEL_FEATURES,
+            "screen_time_minutes": {
+                "max": self.screen_time_max,
+                "min": self.screen_time_min,
+                "count": self.n_rows,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, stats):
+        if stats.get("version") != STATS_VERSION:
+            raise ValueError(f"Unsupported feature stats version: {stats.get('version')!r}")
+        screen_time = stats["screen_time_minutes"]
+        return cls(screen_time["max"], screen_time["min"], screen_time["count"])
+
+    def save(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+
+# The statistics live next to the model: models/burnout_model.pkl -> models/burnout_model.features.json
+def stats_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".features.json"
+
+
+# Load the transformer saved alongside `model_path`, or return None if the model
+# predates persisted statistics.
+def load_transformer_for_model(model_path):
+    path = stats_path_for(model_path)
+    if not os.path.exists(path):
+        return None
+    return FeatureTransformer.load(path)
@@ -0,0 +1,298 @@
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from columnar_io import TableWriter, detect_format, iter_table_chunks, read_table
+from feature_extraction import RAW_DTYPES
+
+# --- Typed, Validated Ingestion ---
+# The raw activity schema (data/remote_mind_data.csv) is declared once below:
+# column names, dtypes, value ranges and allowed categories. CSV files are
+# parsed with those explicit dtypes, which skips pandas' per-column type
+# inference. Every row is then checked with vectorized masks, and rows that
+# break the schema are set aside with the reason instead of failing the upload.
+#
+#   result = read_validated("activity.csv")
+#   result.data        # rows that passed, ready for feature extraction
+#   result.quarantine  # rejected rows + row_number + quarantine_reason
+#
+# A numeric column holding text (e.g. "n/a") cannot be parsed with a float
+# dtype. In that case the file (or, when reading in chunks, only the text of the
+# chunk that failed; the file is still read once) is parsed again with such
+# columns as text and coerced per value, so only the offending rows are
+# quarantined. Quarantined rows keep their values as
+# text, so the offending text can still be found and fixed.
+#
+# Usage (from the project root):
+#   python app/ingestion.py data/remote_mind_data.csv --quarantine data/quarantine.csv
+
+QUARANTINE_REASON = "quarantine_reason"
+ROW_NUMBER = "row_number"
+
+
+class SchemaError(ValueError):
+    pass
+
+
+class ColumnSpec:
+    def __init__(self, name, required=False, min_value=None, max_value=None, categories=None):
+        self.name = name
+        self.dtype = RAW_DTYPES[name]
+        self.required = required
+        self.min_value = min_value
+        self.max_value = max_value
+        self.categories = categories
+
+    @property
+    def is_numeric(self):
+        return self.dtype != "category"
+
+
+# Required columns must be present and non-empty in every row; optional columns
+# may be missing from the file or empty, but present values must be valid.
+RAW_SCHEMA = [
+    ColumnSpec("employee_id"),
+    ColumnSpec("team"),
+    ColumnSpec("country"),
+    ColumnSpec("screen_time_minutes", required=True, min_value=0, max_value=24 * 60),
+    ColumnSpec("breaks_taken", required=True, min_value=0, max_value=100),
+    ColumnSpec("meetings_attended", min_value=0, max_value=100),
+    ColumnSpec("average_meeting_duration", min_value=0, max_value=24 * 60),
+    ColumnSpec("typing_speed_wpm", min_value=0, max_value=300),
+    ColumnSpec("day_of_week", categories=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+                                          "Saturday", "Sunday"]),
+    ColumnSpec("reported_stress_level", min_value=1, max_value=10),
+    ColumnSpec("burnout_index", min_value=0, max_value=100),
+]
+
+
+class IngestResult:
+    def __init__(self, data, quarantine, seconds):
+        self.data = data
+        self.quarantine = quarantine
+        self.seconds = seconds
+
+    @property
+    def rows(self):
+        return len(self.data) + len(self.quarantine)
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / max(self.seconds, 1e-9)
+
+
+# Raise SchemaError if a required column is missing from `columns`.
+def check_columns(columns, schema=RAW_SCHEMA):
+    missing = [spec.name for spec in schema if spec.required and spec.name not in columns]
+    if missing:
+        raise SchemaError(f"Missing required column(s): {', '.join(missing)}")
+
+
+# Per-row validity mask and reasons for `df` (reasons only for invalid rows),
+# plus the typed versions of numeric columns that were read as text, as
+# {name: Series}. `df` itself is not modified; text values that do not parse as
+# numbers count as invalid.
+def validate(df, schema=RAW_SCHEMA):
+    check_columns(df.columns, schema)
+    n = len(df)
+    valid = np.ones(n, dtype=bool)
+    reasons = np.full(n, "", dtype=object)
+    coerced = {}
+
+    def reject(mask, reason):
+        nonlocal valid
+        if mask.any():
+            reasons[mask] += reason + "; "
+            valid &= ~mask
+
+    for spec in schema:
+        if spec.name not in df.columns:
+            continue
+        column = df[spec.name]
+        missing = column.isna().to_numpy()
+        if spec.is_numeric and not pd.api.types.is_numeric_dtype(column):
+            column = coerced[spec.name] = pd.to_numeric(column, errors="coerce").astype(spec.dtype)
+            unparsed = column.isna().to_numpy() & ~missing
+            reject(unparsed, f"{spec.name} is not a number")
+        if spec.required:
+            reject(missing, f"{spec.name} is missing")
+        if spec.is_numeric:
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            if spec.min_value is not None:
+                reject(values < spec.min_value, f"{spec.name} < {spec.min_value}")
+            if spec.max_value is not None:
+                reject(values > spec.max_value, f"{spec.name} > {spec.max_value}")
+        elif spec.categories is not None:
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Check each distinct level once, then look the result up per row.
+                allowed = np.append(column.cat.categories.isin(spec.categories), True)
+                bad = ~allowed[column.cat.codes.to_numpy()]
+            else:
+                bad = ~column.isin(spec.categories).to_numpy() & ~missing
+            reject(bad, f"{spec.name} not one of {', '.join(spec.categories)}")
+    return valid, reasons, coerced
+
+
+# Split `df` into (valid rows, typed; quarantined rows, as text). `first_row` is
+# the row number of df's first row in the file, recorded in the quarantine.
+def split_valid(df, schema=RAW_SCHEMA, first_row=0):
+    valid, reasons, coerced = validate(df, schema)
+    typed = df.assign(**coerced) if coerced else df
+    bad = ~valid
+    quarantine = _quarantine_frame(df[bad], first_row + np.flatnonzero(bad),
+                                   [reason.rstrip("; ") for reason in reasons[bad]])
+    if valid.all():
+        return typed, quarantine
+    data = typed[valid].reset_index(drop=True)
+    # Levels only used by rejected rows (e.g. a misspelt day) should not show up downstream.
+    for name in data.columns:
+        if isinstance(data[name].dtype, pd.CategoricalDtype):
+            data[name] = data[name].cat.remove_unused_categories()
+    return data, quarantine
+
+
+# Quarantined rows with every input column as text (missing values stay
+# missing), so chunks read typed and chunks read as text share one schema when
+# appended to a Parquet/Arrow quarantine file.
+def _quarantine_frame(rows, row_numbers, reasons):
+    quarantine = rows.astype("string").reset_index(drop=True)
+    quarantine[ROW_NUMBER] = np.asarray(row_numbers, dtype=np.int64)
+    quarantine[QUARANTINE_REASON] = pd.array(reasons, dtype="string")
+    return quarantine
+
+
+def _csv_dtypes(schema, tolerant):
+    # In tolerant mode numeric columns are read as text and coerced in `validate`.
+    return {spec.name: (object if tolerant and spec.is_numeric else spec.dtype) for spec in schema}
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+# Parse CSV text with the schema dtypes. If that fails, parse it again with the
+# numeric columns as text: a value that is not a number only fails the typed
+# parse, while real errors (malformed CSV, bad encoding, ...) fail the second
+# parse too and are raised from there.
+def _read_csv_typed(source, schema):
+    try:
+        return pd.read_csv(source, dtype=_csv_dtypes(schema, tolerant=False))
+    except ValueError:
+        _rewind(source)
+        return pd.read_csv(source, dtype=_csv_dtypes(schema, tolerant=True))
+
+
+# Read and validate a whole file (path or file-like object; pass `fmt` for the
+# latter). Raises SchemaError if a required column is missing.
+def read_validated(source, schema=RAW_SCHEMA, fmt=None):
+    start = time.perf_counter()
+    fmt = fmt or detect_format(source)
+    if fmt == "csv":
+        df = _read_csv_typed(source, schema)
+    else:
+        df = read_table(source, fmt=fmt)
+    data, quarantine = split_valid(df, schema)
+    return IngestResult(data, quarantine, time.perf_counter() - start)
+
+
+# Split a CSV file, read once, into the header and blocks of up to `chunksize`
+# records, as bytes. Record ends are found with vectorized scans of each read:
+# a newline ends a record unless it is inside quotes (an odd number of quotes
+# before it), so quoted newlines stay inside their record. Blank lines count
+# towards `chunksize`, so a block may parse to slightly fewer rows.
+def _csv_blocks(path, chunksize, read_size=1 << 22):
+    header, data, ends, quoted = None, bytearray(), np.empty(0, dtype=np.int64), False
+    with open(path, "rb") as fh:
+        while True:
+            buf = fh.read(read_size)
+            if buf:
+                raw = np.frombuffer(buf, dtype=np.uint8)
+                newlines = np.flatnonzero(raw == ord("\n"))
+                if quoted or b'"' in buf:
+                    inside = (np.cumsum(raw == ord('"')) + quoted) % 2 == 1
+                    newlines = newlines[~inside[newlines]]
+                    quoted = bool(inside[-1])
+                ends = np.concatenate([ends, len(data) + newlines + 1])
+                data += buf
+            if header is None and len(ends):
+                header = bytes(data[:ends[0]])
+                del data[:ends[0]]
+                ends = ends[1:] - ends[0]
+            while len(ends) >= chunksize:
+                cut = ends[chunksize - 1]
+                yield header, bytes(data[:cut])
+                del data[:cut]
+                ends = ends[chunksize:] - cut
+            if not buf:
+                break
+    if header is None:
+        if not data:
+            raise pd.errors.EmptyDataError("No columns to parse from file")
+        header, data = bytes(data), bytearray()
+    if data:
+        yield header, bytes(data)
+
+
+# Typed chunks of a CSV file. Each block is parsed on its own, so a block with
+# text in a numeric column is re-parsed (as text) without re-reading the file.
+def _iter_csv_chunks(path, chunksize, schema):
+    for header, block in _csv_blocks(path, chunksize):
+        chunk = _read_csv_typed(io.BytesIO(header + block), schema)
+        if len(chunk):
+            yield chunk
+
+
+# Yield (valid rows, quarantined rows) per chunk of a CSV/Parquet/Arrow file.
+def iter_validated_chunks(path, chunksize=100_000, schema=RAW_SCHEMA):
+    if detect_format(path) == "csv":
+        chunks = _iter_csv_chunks(path, chunksize, schema)
+    else:
+        chunks = iter_table_chunks(path, chunksize)
+    first_row = 0
+    for chunk in chunks:
+        yield split_valid(chunk, schema, first_row)
+        first_row += len(chunk)
+
+
+# Yield only the valid rows of each chunk; rejected rows are appended to
+# `quarantine_path` (created even if no row is rejected).
+def iter_clean_chunks(path, quarantine_path, chunksize=100_000, schema=RAW_SCHEMA):
+    with TableWriter(quarantine_path) as quarantine_writer:
+        for data, quarantine in iter_validated_chunks(path, chunksize, schema):
+            if len(quarantine):
+                quarantine_writer.write(quarantine)
+            if len(data):
+                yield data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate raw activity data against the schema and quarantine bad rows.")
+    parser.add_argument("input", help="Raw activity data (.csv, .parquet or .feather/.arrow)")
+    parser.add_argument("--quarantine", help="Write rejected rows (with the reason) here")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = rejected = 0
+    writer = TableWriter(args.quarantine) if args.quarantine else None
+    try:
+        for data, quarantine in iter_validated_chunks(args.input, args.chunksize):
+            rows += len(data) + len(quarantine)
+            rejected += len(quarantine)
+            if writer is not None and len(quarantine):
+                writer.write(quarantine)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"Validated {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec): "
+          f"{rows - rejected} valid, {rejected} quarantined"
+          + (f" -> {args.quarantine}" if args.quarantine and rejected else ""))
+
+
+if __name__ == "__main__":
+    main()
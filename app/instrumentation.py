@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# --- Pipeline Instrumentation ---
+# Records, per scoring run, the wall time, row count and peak traced memory of
+# each stage (CSV parsing, feature extraction, model load, predict, plotting...).
+#
+#   REMOTEMIND_PROFILE=1 streamlit run app/app.py
+#   REMOTEMIND_PROFILE=1 python app/batch_scoring.py export.csv scored.csv
+#
+#   with profile_run("upload") as run:
+#       with stage("csv_parse") as s:
+#           df = pd.read_csv(...)
+#           s.rows = len(df)
+#
+# When the variable is unset, `profile_run` and `stage` hand back shared no-op
+# objects: the only cost is a function call and a flag check. When it is set,
+# memory is tracked with tracemalloc, which slows allocation-heavy code while
+# a profiled run is active; tracing is stopped again once the last active run
+# that needed it finishes. A stage entered several times in one run (e.g. once
+# per chunk) is accumulated.
+#
+# `peak_bytes` is how far traced memory rose above its level at stage entry.
+# tracemalloc traces the whole process, so allocations made at the same time by
+# other threads (e.g. other Streamlit sessions) are included.
+#
+# Finished runs are summed into process-wide totals that `prometheus_text()`
+# renders in the Prometheus text exposition format, and logged as one JSON line
+# on the "remotemind.perf" logger. To keep those lines, set REMOTEMIND_PROFILE_LOG
+# (or call `set_log_path`, e.g. via `batch_scoring.py --profile-log`) to a file
+# they are appended to.
+
+ENV_VAR = "REMOTEMIND_PROFILE"
+LOG_ENV_VAR = "REMOTEMIND_PROFILE_LOG"
+logger = logging.getLogger("remotemind.perf")
+
+
+def _env_enabled():
+    return os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+_enabled = _env_enabled()
+
+
+def is_enabled():
+    return _enabled
+
+
+# Turn instrumentation on or off at runtime (overrides the environment variable).
+def set_enabled(enabled=True):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+_log_handler = None
+
+
+# Append the JSON line of every finished run to `path` (JSONL); None stops it.
+def set_log_path(path):
+    global _log_handler
+    if _log_handler is not None:
+        logger.removeHandler(_log_handler)
+        _log_handler.close()
+        _log_handler = None
+    if path:
+        _log_handler = logging.FileHandler(path)
+        _log_handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_log_handler)
+        logger.setLevel(logging.INFO)
+
+
+if os.environ.get(LOG_ENV_VAR):
+    set_log_path(os.environ[LOG_ENV_VAR])
+
+
+class StageStats:
+    __slots__ = ("name", "seconds", "calls", "rows", "peak_bytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.peak_bytes = 0
+
+    def to_dict(self):
+        return {"stage": self.name, "seconds": round(self.seconds, 6), "calls": self.calls, "rows": self.rows,
+                "peak_bytes": self.peak_bytes}
+
+
+class ProfileRun:
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}
+        self.started_at = time.time()
+        self.seconds = 0.0
+
+    def stage_stats(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        return stats
+
+    def to_dict(self):
+        return {"run": self.name, "started_at": self.started_at, "seconds": round(self.seconds, 6),
+                "stages": [stats.to_dict() for stats in self.stages.values()]}
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame([stats.to_dict() for stats in self.stages.values()],
+                            columns=["stage", "seconds", "calls", "rows", "peak_bytes"])
+
+
+# Handle yielded by `stage`; set `.rows` inside the block to record a row count.
+class _StageHandle:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class _NullStage:
+    __slots__ = ()
+    rows = property(lambda self: 0, lambda self, value: None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullRun:
+    name = None
+    stages = {}
+    seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def to_dict(self):
+        return {}
+
+    def to_json(self):
+        return "{}"
+
+
+_NULL_STAGE = _NullStage()
+_NULL_RUN = _NullRun()
+_local = threading.local()
+
+# Process-wide totals per (run name, stage), for Prometheus export.
+_totals = {}
+_totals_lock = threading.Lock()
+
+# Profiled runs active in any thread, and whether they turned tracemalloc on.
+_tracing_lock = threading.Lock()
+_active_runs = 0
+_started_tracing = False
+
+
+def _start_tracing():
+    global _active_runs, _started_tracing
+    with _tracing_lock:
+        if _active_runs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _active_runs += 1
+
+
+def _stop_tracing():
+    global _active_runs, _started_tracing
+    with _tracing_lock:
+        _active_runs -= 1
+        if _active_runs == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+@contextmanager
+def _profile_run(name):
+    run = ProfileRun(name)
+    # A run started inside another (e.g. a library call profiled on its own)
+    # gets a fresh stage stack; the outer run's stack is put back afterwards.
+    previous, previous_stack = current_run(), getattr(_local, "stack", [])
+    _local.run, _local.stack = run, []
+    _start_tracing()
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run.seconds = time.perf_counter() - start
+        _local.run, _local.stack = previous, previous_stack
+        _stop_tracing()
+        _record_totals(run)
+        logger.info(run.to_json())
+
+
+# Start a profiled run (no-op unless instrumentation is enabled).
+def profile_run(name):
+    if not _enabled:
+        return _NULL_RUN
+    return _profile_run(name)
+
+
+@contextmanager
+def _stage(run, name):
+    handle = _StageHandle()
+    stack = _local.stack
+    # tracemalloc keeps a single peak: fold the peak so far into the enclosing
+    # stage before resetting it for this one.
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [name, 0, current]
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        stats = run.stage_stats(name)
+        stats.seconds += elapsed
+        stats.calls += 1
+        stats.rows += handle.rows or 0
+        stats.peak_bytes = max(stats.peak_bytes, peak - frame[2])
+
+
+# Time one stage of the current run (no-op when disabled or outside a run).
+def stage(name):
+    if not _enabled:
+        return _NULL_STAGE
+    run = current_run()
+    if run is None:
+        return _NULL_STAGE
+    return _stage(run, name)
+
+
+# --- Export ---
+def _record_totals(run):
+    with _totals_lock:
+        for stats in run.stages.values():
+            total = _totals.setdefault((run.name, stats.name), StageStats(stats.name))
+            total.seconds += stats.seconds
+            total.calls += stats.calls
+            total.rows += stats.rows
+            total.peak_bytes = max(total.peak_bytes, stats.peak_bytes)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Prometheus text exposition of the per-stage totals of all finished runs.
+def prometheus_text():
+    metrics = [
+        ("remotemind_stage_seconds_total", "counter", "Wall time spent in each pipeline stage.", "seconds"),
+        ("remotemind_stage_calls_total", "counter", "Times each pipeline stage ran.", "calls"),
+        ("remotemind_stage_rows_total", "counter", "Rows processed by each pipeline stage.", "rows"),
+        ("remotemind_stage_peak_bytes", "gauge", "Peak traced memory (process-wide) above its level at stage entry.", "peak_bytes"),
+    ]
+    with _totals_lock:
+        totals = list(_totals.items())
+    lines = []
+    for metric, kind, help_text, field in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (run_name, stage_name), stats in totals:
+            lines.append(f'{metric}{{run="{_escape(run_name)}",stage="{_escape(stage_name)}"}} {getattr(stats, field)}')
+    return "\n".join(lines) + "\n"
+
+
+def reset_totals():
+    with _totals_lock:
+        _totals.clear()
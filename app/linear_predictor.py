@@ -0,0 +1,48 @@
+import numpy as np
+
+# --- Linear Model Inference ---
+# The LinearRegression trained by src/model.py reduced to its coefficients, so
+# it can be stored in a model artifact and used without scikit-learn. Prediction
+# is one matrix-vector product.
+
+LINEAR_ARRAYS = ("coef", "intercept")
+
+
+class LinearPredictor:
+    def __init__(self, coef, intercept, n_features, feature_names=None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = np.asarray(intercept, dtype=np.float64).reshape(1)
+        self.n_features = int(n_features)
+        self.feature_names = None if feature_names is None else list(feature_names)
+
+    # Convert a fitted sklearn linear regressor (LinearRegression, Ridge, ...).
+    @classmethod
+    def from_model(cls, model):
+        feature_names = getattr(model, "feature_names_in_", None)
+        return cls(model.coef_, np.atleast_1d(model.intercept_), model.n_features_in_,
+                   None if feature_names is None else [str(name) for name in feature_names])
+
+    # Same input handling as FlatForest: DataFrame columns are picked by name.
+    def _as_matrix(self, X):
+        if hasattr(X, "columns") and self.feature_names is not None:
+            X = X[self.feature_names].to_numpy()
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features}.")
+        return X
+
+    def predict(self, X):
+        return self._as_matrix(X) @ self.coef + self.intercept[0]
+
+    def predict_one(self, row):
+        return float(np.dot(np.asarray(row, dtype=np.float64), self.coef) + self.intercept[0])
+
+    def to_arrays(self):
+        return {
+            "coef": self.coef,
+            "intercept": self.intercept,
+            "n_features": self.n_features,
+            "feature_names": self.feature_names,
+        }
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import zipfile
+
+import numpy as np
+
+from feature_extraction import MODEL_FEATURES
+from feature_transformer import FeatureTransformer
+from flat_forest import FOREST_ARRAYS, FlatForest
+from linear_predictor import LINEAR_ARRAYS, LinearPredictor
+
+# --- Compact Model Artifact ---
+# A versioned, single-file alternative to the joblib pickle that can be loaded
+# and used for prediction without importing scikit-learn:
+#
+#   models/burnout_model.npz   (uncompressed .npz, i.e. a ZIP of .npy files)
+#     manifest   JSON (as uint8 bytes): format, version, model kind, feature
+#                list, feature normalization stats, array names
+#     feature, threshold, left, right, value, roots, depths
+#                kind "flat_forest": the flattened forest arrays (see flat_forest.py)
+#     coef, intercept
+#                kind "linear": a linear model (see linear_predictor.py)
+#
+# Members are stored uncompressed, so `load_artifact` memory-maps each array
+# straight out of the file instead of reading it: start-up cost is a few page
+# faults, and several processes scoring with the same artifact share the pages.
+#
+#   python app/model_artifact.py export models/burnout_model.pkl models/burnout_model.npz
+#   python app/model_artifact.py coldstart models/burnout_model.pkl models/burnout_model.npz
+
+ARTIFACT_FORMAT = "remotemind-model"
+ARTIFACT_VERSION = 1
+ARTIFACT_EXTENSIONS = (".npz",)
+# Model kind -> (predictor class, array names).
+PREDICTOR_KINDS = {
+    "flat_forest": (FlatForest, FOREST_ARRAYS),
+    "linear": (LinearPredictor, LINEAR_ARRAYS),
+}
+
+
+def is_artifact_path(path):
+    return os.path.splitext(str(path))[1].lower() in ARTIFACT_EXTENSIONS
+
+
+class ModelArtifact:
+    def __init__(self, manifest, predictor, transformer):
+        self.manifest = manifest
+        self.predictor = predictor
+        self.transformer = transformer
+
+    @property
+    def features(self):
+        return self.manifest["features"]
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    # Predict from model features (DataFrame with the feature columns, or a matrix).
+    def predict(self, X):
+        return self.predictor.predict(X)
+
+    # Predict straight from raw activity columns (screen_time_minutes, breaks_taken).
+    def predict_raw(self, data):
+        return self.predictor.predict(self.transformer.transform_matrix(data))
+
+
+def _kind_of(predictor):
+    for kind, (cls, _) in PREDICTOR_KINDS.items():
+        if isinstance(predictor, cls):
+            return kind
+    raise TypeError(f"Cannot store a {type(predictor).__name__} in a model artifact.")
+
+
+# Write `predictor` (a FlatForest or LinearPredictor) and its feature statistics
+# as an artifact. Arrays are stored with their own dtypes (e.g. float32 thresholds).
+def save_artifact(path, predictor, transformer):
+    kind = _kind_of(predictor)
+    array_names = PREDICTOR_KINDS[kind][1]
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": ARTIFACT_VERSION,
+        "kind": kind,
+        "features": predictor.feature_names or MODEL_FEATURES,
+        "n_features": predictor.n_features,
+        "feature_stats": transformer.to_dict(),
+        "arrays": list(array_names),
+    }
+    arrays = {name: np.ascontiguousarray(getattr(predictor, name)) for name in array_names}
+    arrays["manifest"] = np.frombuffer(json.dumps(manifest).encode(), dtype=np.uint8)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)  # np.savez stores members uncompressed, which mmap needs
+    os.replace(tmp_path, path)
+    return path
+
+
+# Export a pickled sklearn forest (plus the stats saved next to it) as an artifact.
+def export_model(model_path, artifact_path):
+    from feature_transformer import load_transformer_for_model
+    from flat_forest import load_flat_forest
+
+    transformer = load_transformer_for_model(model_path)
+    if transformer is None:
+        raise FileNotFoundError(f"No feature statistics found next to '{model_path}'.")
+    return save_artifact(artifact_path, load_flat_forest(model_path), transformer)
+
+
+# Map every uncompressed .npy member of an .npz file into memory (read-only).
+def _mmap_npz(path):
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as fh:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            # Local file header: 30 fixed bytes, then file name and extra field.
+            fh.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(fh.read(4), dtype="<u2")
+            fh.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fh)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fh)
+            else:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            if dtype.hasobject:
+                raise ValueError(f"Artifact member '{name}' holds Python objects; refusing to load it.")
+            arrays[name] = np.memmap(fh.name, dtype=dtype, mode="r", offset=fh.tell(), shape=shape,
+                                     order="F" if fortran_order else "C")
+    return arrays
+
+
+# Load an artifact; with mmap=False the arrays are read into memory instead.
+def load_artifact(path, mmap=True):
+    if mmap:
+        arrays = _mmap_npz(path)
+    else:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+
+    manifest = json.loads(bytes(np.asarray(arrays.pop("manifest"))).decode())
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"'{path}' is not a {ARTIFACT_FORMAT} artifact.")
+    if manifest.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported artifact version {manifest.get('version')!r} in '{path}' "
+                         f"(this code reads version {ARTIFACT_VERSION}).")
+
+    if manifest.get("kind") not in PREDICTOR_KINDS:
+        raise ValueError(f"Unsupported model kind {manifest.get('kind')!r} in '{path}'.")
+    cls, array_names = PREDICTOR_KINDS[manifest["kind"]]
+    predictor = cls(**{name: arrays[name] for name in array_names},
+                    n_features=manifest["n_features"], feature_names=manifest["features"])
+    transformer = FeatureTransformer.from_dict(manifest["feature_stats"])
+    return ModelArtifact(manifest, predictor, transformer)
+
+
+# --- Cold-start Measurement ---
+# Each snippet runs in a fresh interpreter and prints the seconds from the start
+# of the script to the first prediction (imports included). Total process wall
+# time, which also covers interpreter start-up, is measured from outside.
+_COLDSTART_SNIPPETS = {
+    "pickle (joblib + sklearn)": """
+import time; start = time.perf_counter()
+import sys; sys.path.insert(0, {app_dir!r})
+import pandas as pd
+from feature_transformer import load_transformer_for_model
+from model_registry import load_pickle
+model = load_pickle({model_path!r})
+row = pd.DataFrame({{"screen_time_minutes": [420.0], "breaks_taken": [3.0]}})
+features = load_transformer_for_model({model_path!r}).transform(row)[{features!r}]
+model.predict(features)
+print(time.perf_counter() - start, "sklearn" in sys.modules)
+""",
+    "artifact (mmap, NumPy only)": """
+import time; start = time.perf_counter()
+import sys; sys.path.insert(0, {app_dir!r})
+import pandas as pd
+from model_artifact import load_artifact
+artifact = load_artifact({artifact_path!r})
+row = pd.DataFrame({{"screen_time_minutes": [420.0], "breaks_taken": [3.0]}})
+artifact.predict_raw(row)
+print(time.perf_counter() - start, "sklearn" in sys.modules)
+""",
+}
+
+
+def measure_cold_start(model_path, artifact_path, repeat=3):
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, template in _COLDSTART_SNIPPETS.items():
+        code = template.format(app_dir=app_dir, model_path=model_path, artifact_path=artifact_path,
+                               features=MODEL_FEATURES)
+        in_process, wall = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True,
+                                    check=True).stdout.split()
+            wall.append(time.perf_counter() - start)
+            in_process.append(float(output[0]))
+        results[name] = {"first_prediction_s": min(in_process), "process_wall_s": min(wall),
+                         "imports_sklearn": output[1] == "True"}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and benchmark the compact model artifact.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Convert a pickled forest into an artifact")
+    export.add_argument("model", help="Pickled model (feature stats must sit next to it)")
+    export.add_argument("artifact", help="Output .npz path")
+    cold = commands.add_parser("coldstart", help="Compare time to first prediction: pickle vs artifact")
+    cold.add_argument("model")
+    cold.add_argument("artifact")
+    cold.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_model(args.model, args.artifact)
+        print(f"Artifact written to '{args.artifact}' ({os.path.getsize(args.artifact) / 1024:.1f} KiB, "
+              f"pickle {os.path.getsize(args.model) / 1024:.1f} KiB)")
+    else:
+        results = measure_cold_start(args.model, args.artifact, args.repeat)
+        print(f"{'path':30s} {'first prediction':>17s} {'process wall':>13s}  sklearn imported")
+        for name, r in results.items():
+            print(f"{name:30s} {r['first_prediction_s'] * 1000:14.0f} ms {r['process_wall_s'] * 1000:10.0f} ms  "
+                  f"{r['imports_sklearn']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# --- Process-wide Model Registry ---
+# Streamlit re-executes app.py on every widget interaction, but imported modules
+# stay alive in sys.modules for the lifetime of the server process. Keeping the
+# registry at module level therefore means each model artifact is unpickled once
+# per process instead of once per rerun.
+
+
+# Default loader for pickled sklearn models. joblib is imported on first use so
+# paths that only load NumPy artifacts (see model_artifact.py) never pay for it.
+def load_pickle(path):
+    import joblib
+
+    return joblib.load(path)
+
+
+# Compute a SHA-256 digest of raw bytes (e.g. the contents of an uploaded file).
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# Compute a SHA-256 digest of a file on disk, reading it in blocks so large
+# artifacts never have to be held in memory at once.
+def file_hash(path, block_size=1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _RegistryEntry:
+    def __init__(self, model, mtime_ns, size, digest):
+        self.model = model
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    # Return the loaded model for `path`, loading it on first use.
+    # The file is only re-read when its mtime or size changes, and even then the
+    # (cheap) content hash is compared first so that a `touch` or a re-save of an
+    # identical artifact does not trigger a full unpickle.
+    def get(self, path, loader=load_pickle):
+        return self._get_entry(path, loader).model
+
+    # Return the content hash of the currently loaded version of `path`.
+    # Useful as part of a cache key so cached predictions are invalidated when
+    # the model is retrained.
+    def digest(self, path, loader=load_pickle) -> str:
+        return self._get_entry(path, loader).digest
+
+    # Return (model, digest) from the same registry entry, so the digest always
+    # describes the model that was returned even if the file is replaced meanwhile.
+    def get_with_digest(self, path, loader=load_pickle):
+        entry = self._get_entry(path, loader)
+        return entry.model, entry.digest
+
+    def _get_entry(self, path, loader):
+        key = (os.path.abspath(path), loader)
+        stat = os.stat(path)  # Raises FileNotFoundError like joblib.load would
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                return entry
+
+            digest = file_hash(path)
+            if entry is not None and entry.digest == digest:
+                # Same bytes, new timestamp: keep the already loaded model.
+                entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                return entry
+
+            entry = _RegistryEntry(loader(path), stat.st_mtime_ns, stat.st_size, digest)
+            self._entries[key] = entry
+            return entry
+
+    # Drop one cached model (or all of them) so the next `get` reloads from disk.
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                path = os.path.abspath(path)
+                for key in [k for k in self._entries if k[0] == path]:
+                    del self._entries[key]
+
+
+# --- Prediction Cache ---
+# Small LRU cache of scored DataFrames keyed by (upload content hash, model hash).
+# Reruns on the same upload hit the cache and skip parsing, feature engineering
+# and prediction entirely. Cached frames are shared, so callers must treat them
+# as read-only.
+class PredictionCache:
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, upload_digest, model_digest):
+        key = (upload_digest, model_digest)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, upload_digest, model_digest, result):
+        key = (upload_digest, model_digest)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Return the cached result for the key, computing and storing it on a miss.
+    def get_or_compute(self, upload_digest, model_digest, compute):
+        result = self.get(upload_digest, model_digest)
+        if result is None:
+            result = compute()
+            self.put(upload_digest, model_digest, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# --- Module-level Singletons ---
+registry = ModelRegistry()
+prediction_cache = PredictionCache()
+
+
+def get_model(path, loader=load_pickle):
+    return registry.get(path, loader)
+
+
+def get_model_digest(path, loader=load_pickle) -> str:
+    return registry.digest(path, loader)
+
+
+def get_model_with_digest(path, loader=load_pickle):
+    return registry.get_with_digest(path, loader)
@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from flat_forest import FlatForest
+from linear_predictor import LinearPredictor
+from model_artifact import save_artifact
+
+# --- Compact Model Variants ---
+# Next to the main forest, training writes smaller variants as model artifacts
+# (see model_artifact.py) and a report comparing their accuracy, speed and size:
+#
+#   models/burnout_model.npz                 forest        main forest, float64
+#   models/burnout_model.forest_f32.npz      forest_f32    main forest, float32 thresholds/leaf values
+#   models/burnout_model.forest_t20_d8.npz   ...           fewer, depth-limited or pruned trees (float32)
+#   models/burnout_model.linear.npz          linear        the LinearRegression
+#   models/burnout_model.variants.json       the report (R^2, MAE, latency, throughput, size)
+#
+# Accuracy is estimated by K-fold cross-validation over all labelled rows
+# (train + test): each variant's recipe is refitted and converted on every fold,
+# and the report gives the mean and standard deviation of R^2 and MAE across
+# folds, plus the number of rows. The held-out test scores of the saved
+# variants are kept as `test_r2`/`test_mae` for reference only; with a small
+# test split they are too noisy to rank variants by.
+#
+# Float32 thresholds are rounded down to the nearest float32. The forest compares
+# float32 inputs, and for those `x > t` and `x > float32_down(t)` always agree, so
+# quantized splits route every row exactly as before. Only the float32 leaf
+# values lose precision (about 1e-6 relative).
+#
+# Scoring paths pick a variant with `select_variant`: the variant with the best
+# cross-validated R^2 whose measured predict latency fits the budget. Latencies in the report are
+# from the machine that trained the model; rebuild it on the serving hardware
+# for accurate selection.
+#
+#   python app/model_variants.py report
+#   python app/model_variants.py select --latency-budget-ms 0.2
+#   python app/scoring_service.py --latency-budget-ms 0.2
+#   python app/batch_scoring.py data/remote_mind_data.csv scored.csv --latency-budget-ms 50
+
+REPORT_VERSION = 2
+MAIN_VARIANT = "forest"
+LINEAR_VARIANT = "linear"
+QUANTIZED_MAIN_VARIANT = "forest_f32"
+# Smaller forests trained next to the main model (RandomForestRegressor parameters).
+FOREST_VARIANTS = {
+    "forest_t20_d8": {"n_estimators": 20, "max_depth": 8},
+    "forest_t10_d5": {"n_estimators": 10, "max_depth": 5},
+    "forest_t20_pruned": {"n_estimators": 20, "ccp_alpha": 1.0},
+}
+RANDOM_STATE = 42
+CV_FOLDS = 5
+# Timing: median of LATENCY_REPEAT single-row calls, and one THROUGHPUT_ROWS batch.
+LATENCY_REPEAT = 200
+THROUGHPUT_ROWS = 100_000
+
+
+def variant_path(model_path, name):
+    base = os.path.splitext(model_path)[0]
+    return base + ".npz" if name == MAIN_VARIANT else f"{base}.{name}.npz"
+
+
+def report_path_for(model_path):
+    return os.path.splitext(model_path)[0] + ".variants.json"
+
+
+# Float32 copy of a flattened forest (thresholds rounded down, see above).
+def quantize_forest(forest):
+    arrays = forest.to_arrays()
+    threshold = np.asarray(arrays["threshold"], dtype=np.float64)
+    threshold32 = threshold.astype(np.float32)
+    rounded_up = threshold32.astype(np.float64) > threshold
+    threshold32[rounded_up] = np.nextafter(threshold32[rounded_up], np.float32(-np.inf))
+    arrays["threshold"] = threshold32
+    arrays["value"] = np.asarray(arrays["value"], dtype=np.float32)
+    if forest.n_features <= np.iinfo(np.uint8).max:
+        arrays["feature"] = np.asarray(arrays["feature"], dtype=np.uint8)
+    return FlatForest(**arrays)
+
+
+# Single-row latency (ms, median) and batch throughput (rows/sec) of `predictor`.
+def measure_speed(predictor, X, repeat=LATENCY_REPEAT, batch_rows=THROUGHPUT_ROWS):
+    X = np.asarray(X, dtype=np.float64)
+    row = X[:1]
+    predictor.predict(row)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predictor.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    batch = X[np.random.default_rng(0).integers(0, len(X), batch_rows)]
+    start = time.perf_counter()
+    predictor.predict(batch)
+    elapsed = time.perf_counter() - start
+    return float(np.median(timings)) * 1000, batch_rows / max(elapsed, 1e-9)
+
+
+# Mean and standard deviation of R^2 and MAE over K folds of (X, y). `fit`
+# returns a fitted sklearn estimator for a fold's training rows, and `convert`
+# turns it into the predictor that would be saved (flattened, quantized, ...).
+def cross_validate(fit, convert, X, y, n_splits=CV_FOLDS):
+    from sklearn.metrics import mean_absolute_error, r2_score
+    from sklearn.model_selection import KFold
+
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    r2, mae = [], []
+    for train_idx, test_idx in KFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE).split(X):
+        predicted = convert(fit(X[train_idx], y[train_idx])).predict(X[test_idx])
+        r2.append(r2_score(y[test_idx], predicted))
+        mae.append(mean_absolute_error(y[test_idx], predicted))
+    return {"r2": float(np.mean(r2)), "r2_std": float(np.std(r2)),
+            "mae": float(np.mean(mae)), "mae_std": float(np.std(mae))}
+
+
+# Save every variant as an artifact next to `model_path` and write the report.
+# `model` is the fitted main forest; `linear_model` an already fitted linear
+# regressor (trained here if None). Accuracy is cross-validated over the train
+# and test rows together (see above). Returns the report.
+def build_variants(model, X_train, y_train, X_test, y_test, transformer, model_path, linear_model=None,
+                   cv_folds=CV_FOLDS):
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    if linear_model is None:
+        linear_model = LinearRegression().fit(X_train, y_train)
+    flat = FlatForest.from_model
+    quantized = lambda estimator: quantize_forest(FlatForest.from_model(estimator))
+    # (name, params, saved predictor, unfitted estimator to cross-validate, estimator -> predictor)
+    variants = [(MAIN_VARIANT, {}, flat(model), clone(model), flat),
+                (QUANTIZED_MAIN_VARIANT, {}, quantized(model), clone(model), quantized)]
+    for name, params in FOREST_VARIANTS.items():
+        forest = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=-1, **params)
+        variants.append((name, params, quantized(clone(forest).fit(X_train, y_train)), forest, quantized))
+    variants.append((LINEAR_VARIANT, {}, LinearPredictor.from_model(linear_model), clone(linear_model),
+                     LinearPredictor.from_model))
+
+    X_all = np.concatenate([np.asarray(X_train, dtype=np.float64), np.asarray(X_test, dtype=np.float64)])
+    y_all = np.concatenate([np.asarray(y_train, dtype=np.float64), np.asarray(y_test, dtype=np.float64)])
+    entries = []
+    for name, params, predictor, estimator, convert in variants:
+        path = save_artifact(variant_path(model_path, name), predictor, transformer)
+        scores = cross_validate(lambda X, y: clone(estimator).fit(X, y), convert, X_all, y_all, cv_folds)
+        predicted = predictor.predict(X_test)
+        latency_ms, throughput = measure_speed(predictor, X_test)
+        entries.append({
+            "name": name,
+            "file": os.path.basename(path),
+            "kind": "linear" if isinstance(predictor, LinearPredictor) else "flat_forest",
+            "params": params,
+            "nodes": len(predictor.value) if isinstance(predictor, FlatForest) else 0,
+            "size_bytes": os.path.getsize(path),
+            **scores,
+            "test_r2": float(r2_score(y_test, predicted)),
+            "test_mae": float(mean_absolute_error(y_test, predicted)),
+            "latency_ms": latency_ms,
+            "throughput_rows_per_sec": throughput,
+        })
+
+    report = {"version": REPORT_VERSION, "cv_folds": cv_folds, "cv_rows": len(y_all), "test_rows": len(y_test),
+              "variants": entries}
+    with open(report_path_for(model_path), "w") as fh:
+        json.dump(report, fh, indent=2)
+    return report
+
+
+def load_report(model_path):
+    path = report_path_for(model_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No variant report at '{path}'. Retrain with src/model.py to build the variants.")
+    with open(path) as fh:
+        report = json.load(fh)
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"Unsupported variant report version: {report.get('version')!r}")
+    return report
+
+
+# Estimated predict time (ms) of a variant for a call with `rows` rows.
+def estimated_latency_ms(entry, rows=1):
+    if rows <= 1:
+        return entry["latency_ms"]
+    return rows / entry["throughput_rows_per_sec"] * 1000
+
+
+# The most accurate variant (highest cross-validated R^2) whose predict time for `rows` rows fits
+# `latency_budget_ms`, or the fastest one if none does. Returns (artifact path, entry).
+def select_variant(model_path, latency_budget_ms, rows=1):
+    report = load_report(model_path)
+    variants = report["variants"]
+    fitting = [entry for entry in variants if estimated_latency_ms(entry, rows) <= latency_budget_ms]
+    if fitting:
+        entry = max(fitting, key=lambda entry: entry["r2"])
+    else:
+        entry = min(variants, key=lambda entry: estimated_latency_ms(entry, rows))
+    return os.path.join(os.path.dirname(report_path_for(model_path)), entry["file"]), entry
+
+
+def format_report(report):
+    lines = [f"Accuracy: {report['cv_folds']}-fold cross-validation over {report['cv_rows']} rows (mean +/- std)",
+             f"{'variant':18s} {'R^2':>16s} {'MAE':>15s} {'1-row ms':>9s} {'rows/sec':>12s} {'size KiB':>9s} "
+             f"{'nodes':>7s}"]
+    for entry in report["variants"]:
+        lines.append(f"{entry['name']:18s} {entry['r2']:7.4f} +/- {entry['r2_std']:.3f} "
+                     f"{entry['mae']:6.3f} +/- {entry['mae_std']:.3f} {entry['latency_ms']:9.4f} "
+                     f"{entry['throughput_rows_per_sec']:12,.0f} {entry['size_bytes'] / 1024:9.1f} {entry['nodes']:7d}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the compact model variants and pick one by latency budget.")
+    parser.add_argument("--model", default="models/burnout_model.pkl")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("report", help="Print the accuracy/speed/size report")
+    select = commands.add_parser("select", help="Print the variant chosen for a latency budget")
+    select.add_argument("--latency-budget-ms", type=float, required=True)
+    select.add_argument("--rows", type=int, default=1, help="Rows per predict call")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        print(format_report(load_report(args.model)))
+    else:
+        path, entry = select_variant(args.model, args.latency_budget_ms, args.rows)
+        print(f"{entry['name']} ({path}): CV R^2 {entry['r2']:.4f} +/- {entry['r2_std']:.3f}, "
+              f"~{estimated_latency_ms(entry, args.rows):.4f} ms for {args.rows} row(s)")
+
+
+if __name__ == "__main__":
+    main()
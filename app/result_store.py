@@ -0,0 +1,240 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingestion import RAW_SCHEMA
+
+# --- Scored Result Store ---
+# Every scored row is appended to a local SQLite database, so an employee's
+# past scores can be looked up without re-uploading and re-scoring files.
+#
+#   scores     one row per (raw row content, model): identifying columns, the
+#              score date and the predicted burnout index. Indexed by
+#              (employee_id, score_date), (team, score_date) and score_date.
+#   employees  one row per (model, employee), kept up to date on insert: latest
+#              score, mean, max and count. Indexed by latest and mean score, so
+#              the top-N at-risk query reads N index entries instead of
+#              grouping the whole history.
+#
+# Rows are identified by a 64-bit hash of their raw column values, cast to the
+# schema dtypes first so the same rows hash alike however they were read (typed
+# CSV, Parquet, ...). Rows that were already scored with the same model are
+# looked up instead of predicted again, so re-submitting a file (or an
+# overlapping export) costs one indexed lookup per row.
+#
+# The score date is taken from a `date` column when the data has one. Rows
+# without a date (or with one that does not parse) are stored with a NULL date:
+# they count towards the employee aggregates, but are left out of date-range
+# queries and listed after dated rows.
+
+DEFAULT_DB_PATH = "data/results/scored_history.sqlite"
+DATE_COLUMN = "date"
+VALUE_COLUMN = "Predicted_Burnout_Index"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    row_hash INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    employee_id TEXT,
+    team TEXT,
+    score_date TEXT,
+    batch_id TEXT,
+    predicted REAL NOT NULL,
+    PRIMARY KEY (row_hash, model)
+);
+CREATE INDEX IF NOT EXISTS scores_employee_date ON scores (employee_id, score_date);
+CREATE INDEX IF NOT EXISTS scores_team_date ON scores (team, score_date);
+CREATE INDEX IF NOT EXISTS scores_date ON scores (score_date);
+
+CREATE TABLE IF NOT EXISTS employees (
+    model TEXT NOT NULL,
+    employee_id TEXT NOT NULL,
+    team TEXT,
+    last_date TEXT,
+    last_score REAL,
+    max_score REAL,
+    mean_score REAL,
+    n_scores INTEGER NOT NULL,
+    PRIMARY KEY (model, employee_id)
+);
+CREATE INDEX IF NOT EXISTS employees_last_score ON employees (model, last_score);
+CREATE INDEX IF NOT EXISTS employees_mean_score ON employees (model, mean_score);
+CREATE INDEX IF NOT EXISTS employees_team_last_score ON employees (model, team, last_score);
+"""
+
+_UPSERT_EMPLOYEE = """
+INSERT INTO employees (model, employee_id, team, last_date, last_score, max_score, mean_score, n_scores)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (model, employee_id) DO UPDATE SET
+    team = excluded.team,
+    -- Dated scores win over undated ones; between undated scores the newest insert wins.
+    last_score = CASE WHEN excluded.last_date IS NULL AND employees.last_date IS NOT NULL THEN employees.last_score
+                      WHEN employees.last_date IS NULL OR excluded.last_date >= employees.last_date
+                      THEN excluded.last_score ELSE employees.last_score END,
+    last_date = MAX(COALESCE(employees.last_date, excluded.last_date), COALESCE(excluded.last_date, employees.last_date)),
+    max_score = MAX(employees.max_score, excluded.max_score),
+    mean_score = (employees.mean_score * employees.n_scores + excluded.mean_score * excluded.n_scores)
+                 / (employees.n_scores + excluded.n_scores),
+    n_scores = employees.n_scores + excluded.n_scores
+"""
+
+TOP_ORDERINGS = {"last": "last_score", "mean": "mean_score"}
+
+
+# 64-bit content hash of each row over the raw schema columns present in `df`
+# (as signed integers, which is what SQLite stores). Columns are taken in schema
+# order and normalized first: numbers to the schema dtype, categories to text.
+def row_hashes(df):
+    normalized = pd.DataFrame({
+        spec.name: df[spec.name].astype(spec.dtype if spec.is_numeric else object)
+        for spec in RAW_SCHEMA if spec.name in df.columns
+    }, index=df.index)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy().view(np.int64)
+
+
+def _text(values):
+    return [None if pd.isna(value) else str(value) for value in values]
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Streamlit runs each session's script in its own thread; one connection
+        # is shared and serialized by the lock.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # Predictions already stored for `hashes` under `model`, as a float array with
+    # NaN where the row has not been scored yet.
+    def lookup(self, hashes, model):
+        with self._lock:
+            return self._lookup(np.asarray(hashes, dtype=np.int64), model)
+
+    # The hashes go into a temporary table and are joined against the primary key
+    # in one statement, instead of one query per row.
+    def _lookup(self, hashes, model):
+        found = np.full(len(hashes), np.nan)
+        if len(hashes) == 0:
+            return found
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (pos INTEGER PRIMARY KEY, row_hash INTEGER)")
+        self._conn.execute("DELETE FROM lookup")
+        self._conn.executemany("INSERT INTO lookup VALUES (?, ?)", enumerate(hashes.tolist()))
+        rows = self._conn.execute(
+            "SELECT lookup.pos, scores.predicted FROM lookup "
+            "JOIN scores ON scores.row_hash = lookup.row_hash AND scores.model = ?", (model,)).fetchall()
+        self._conn.execute("DELETE FROM lookup")
+        if rows:
+            positions, values = np.array(rows).T
+            found[positions.astype(np.intp)] = values
+        return found
+
+    # Append scored rows. `hashes` are their `row_hashes`; rows already stored
+    # for `model` (or repeated within `df`) are skipped. `score_date` (a date) is
+    # used when `df` has no date column. Returns a boolean mask of the rows that
+    # were added, so callers can fold exactly those rows into other aggregates.
+    def add(self, df, hashes, model, batch_id=None, score_date=None):
+        hashes = np.asarray(hashes, dtype=np.int64)
+        with self._lock, self._conn:
+            new = np.isnan(self._lookup(hashes, model)) & ~pd.Series(hashes).duplicated().to_numpy()
+            if not new.any():
+                return new
+            records = self._records(df[new], hashes[new], model, batch_id, score_date)
+            self._conn.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   records.itertuples(index=False, name=None))
+            self._update_employees(records, model)
+        return new
+
+    def _records(self, df, hashes, model, batch_id, score_date):
+        if DATE_COLUMN in df.columns:
+            dates = _text(pd.to_datetime(df[DATE_COLUMN], errors="coerce").dt.strftime("%Y-%m-%d"))
+        else:
+            dates = [None if score_date is None else score_date.isoformat()] * len(df)
+        employee_ids = _text(df["employee_id"]) if "employee_id" in df.columns else [None] * len(df)
+        teams = _text(df["team"]) if "team" in df.columns else [None] * len(df)
+        return pd.DataFrame({"row_hash": hashes, "model": model, "employee_id": employee_ids, "team": teams,
+                             "score_date": dates, "batch_id": batch_id,
+                             "predicted": df[VALUE_COLUMN].to_numpy(dtype=np.float64)})
+
+    # Fold newly added rows into the per-employee aggregates.
+    def _update_employees(self, records, model):
+        # Undated rows first, so "last" picks the latest dated score when there is one.
+        records = records.dropna(subset=["employee_id"]).sort_values("score_date", kind="stable", na_position="first")
+        if records.empty:
+            return
+        summary = records.groupby("employee_id", sort=False).agg(
+            team=("team", "last"), last_date=("score_date", "last"), last_score=("predicted", "last"),
+            max_score=("predicted", "max"), mean_score=("predicted", "mean"), n_scores=("predicted", "size"))
+        rows = [(model, employee_id, team, None if pd.isna(last_date) else last_date,
+                 float(last_score), float(max_score), float(mean_score), int(n_scores))
+                for employee_id, team, last_date, last_score, max_score, mean_score, n_scores
+                in summary.reset_index().itertuples(index=False, name=None)]
+        self._conn.executemany(_UPSERT_EMPLOYEE, rows)
+
+    # --- Queries ---
+    # Scored history, newest first, for one employee and/or team under one model
+    # (pass the active model, so scores of different variants are not mixed) and
+    # an optional date range (ISO strings, inclusive). Undated rows are listed
+    # last, and left out when a date range is given.
+    def history(self, employee_id=None, team=None, start=None, end=None, model=None, limit=1000):
+        conditions, params = [], []
+        for column, value in (("employee_id", employee_id), ("team", team), ("model", model)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(str(value))
+        if start is not None:
+            conditions.append("score_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("score_date <= ?")
+            params.append(str(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = (f"SELECT employee_id, team, score_date, predicted AS {VALUE_COLUMN}, model, batch_id FROM scores "
+                 f"{where} ORDER BY score_date IS NULL, score_date DESC LIMIT ?")
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params + [int(limit)])
+
+    # The `n` employees with the highest latest (`by="last"`) or mean score under
+    # `model`, optionally within one team.
+    def top_at_risk(self, model, n=10, by="last", team=None):
+        order = TOP_ORDERINGS[by]
+        where, params = ("WHERE model = ?", [model])
+        if team is not None:
+            where, params = where + " AND team = ?", params + [str(team)]
+        query = (f"SELECT employee_id, team, last_date, last_score, mean_score, max_score, n_scores FROM employees "
+                 f"{where} ORDER BY {order} DESC LIMIT ?")
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params + [int(n)])
+
+    # Ids of the employees scored under `model`.
+    def employees(self, model):
+        with self._lock:
+            rows = self._conn.execute("SELECT employee_id FROM employees WHERE model = ? ORDER BY employee_id", (model,))
+            return [row[0] for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+# Process-wide store instances (one per path), shared across Streamlit reruns and sessions.
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_result_store(path=DEFAULT_DB_PATH):
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ResultStore(path)
+        return _stores[key]
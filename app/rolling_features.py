@@ -0,0 +1,206 @@
+import json
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# --- Per-employee Rolling Features ---
+# `create_features` looks at each employee-day on its own. These features look
+# back over an employee's previous days:
+#
+#   Screen_Time_7d_Mean         mean screen_time_minutes over the last 7 days (incl. today)
+#   Cumulative_Meeting_Minutes  running total of meetings_attended * average_meeting_duration
+#   Break_Deficit_Streak        consecutive days (up to today) with fewer than
+#                               BREAK_DEFICIT_THRESHOLD breaks; 0 on a day with enough breaks
+#
+# Rows of one employee are taken in file order (or by `order_column` when the
+# data has a date). `add_rolling_features` computes them for a whole batch with
+# one stable sort and cumulative sums; `RollingFeatureState` keeps O(1) state per
+# employee so a new day, or a new chunk of a streamed file (see
+# `batch_scoring.py --rolling`), can be appended without touching the history.
+
+WINDOW_DAYS = 7
+BREAK_DEFICIT_THRESHOLD = 3
+ROLLING_FEATURES = ["Screen_Time_7d_Mean", "Cumulative_Meeting_Minutes", "Break_Deficit_Streak"]
+INPUT_COLUMNS = ["employee_id", "screen_time_minutes", "breaks_taken", "meetings_attended", "average_meeting_duration"]
+
+
+# Compute the rolling features for every row; returns them as a DataFrame aligned
+# with `df` (original row order), without modifying `df`.
+def compute_rolling_features(df: pd.DataFrame, window=WINDOW_DAYS, order_column=None):
+    n = len(df)
+    if n == 0:
+        frame = pd.DataFrame({name: np.empty(0) for name in ROLLING_FEATURES}, index=df.index)
+        return frame.astype({"Break_Deficit_Streak": np.int64})
+
+    # --- Sort once: group rows of each employee together, keeping time order ---
+    employee_codes, _ = pd.factorize(df["employee_id"])
+    if order_column is None:
+        order = np.argsort(employee_codes, kind="stable")
+    else:
+        order = np.lexsort((df[order_column].to_numpy(), employee_codes))
+    codes = employee_codes[order]
+    positions = np.arange(n)
+    is_start = np.empty(n, dtype=bool)
+    is_start[0] = True
+    is_start[1:] = codes[1:] != codes[:-1]
+    group_start = np.maximum.accumulate(np.where(is_start, positions, 0))
+
+    screen_time = df["screen_time_minutes"].to_numpy(dtype=np.float64)[order]
+    meeting_minutes = (df["meetings_attended"].to_numpy(dtype=np.float64)
+                       * df["average_meeting_duration"].to_numpy(dtype=np.float64))[order]
+    deficit = df["breaks_taken"].to_numpy(dtype=np.float64)[order] < BREAK_DEFICIT_THRESHOLD
+
+    # --- Rolling mean via a global cumulative sum ---
+    # The window of row i covers max(group_start, i - window + 1) .. i.
+    screen_cumsum = np.concatenate([[0.0], np.cumsum(screen_time)])
+    window_len = np.minimum(positions - group_start + 1, window)
+    rolling_mean = (screen_cumsum[positions + 1] - screen_cumsum[positions + 1 - window_len]) / window_len
+
+    # --- Cumulative meeting minutes: global cumsum minus the total before the group ---
+    meeting_cumsum = np.concatenate([[0.0], np.cumsum(meeting_minutes)])
+    cumulative_meetings = meeting_cumsum[positions + 1] - meeting_cumsum[group_start]
+
+    # --- Deficit streaks: distance to the last reset (a non-deficit day or the group start) ---
+    reset = np.where(~deficit, positions, np.where(is_start, positions - 1, -1))
+    streak = np.where(deficit, positions - np.maximum.accumulate(reset), 0)
+
+    # Scatter back to the original row order.
+    result = np.empty((n, len(ROLLING_FEATURES)))
+    result[order, 0] = rolling_mean
+    result[order, 1] = cumulative_meetings
+    result[order, 2] = streak
+    frame = pd.DataFrame(result, columns=ROLLING_FEATURES, index=df.index)
+    frame["Break_Deficit_Streak"] = frame["Break_Deficit_Streak"].astype(np.int64)
+    return frame
+
+
+# Add the rolling feature columns to `df` in place (like `create_features`) and return it.
+def add_rolling_features(df: pd.DataFrame, window=WINDOW_DAYS, order_column=None):
+    rolling = compute_rolling_features(df, window, order_column)
+    for name in ROLLING_FEATURES:
+        df[name] = rolling[name].to_numpy()
+    return df
+
+
+# --- Incremental State ---
+class EmployeeRollingState:
+    def __init__(self, window=WINDOW_DAYS, recent_screen_time=(), cumulative_meeting_minutes=0.0, deficit_streak=0):
+        self.recent_screen_time = deque(recent_screen_time, maxlen=window)
+        self.window_sum = float(sum(self.recent_screen_time))
+        self.cumulative_meeting_minutes = float(cumulative_meeting_minutes)
+        self.deficit_streak = int(deficit_streak)
+
+    # Fold in one new day and return its rolling features. O(1) per call.
+    def update(self, screen_time_minutes, breaks_taken, meetings_attended, average_meeting_duration):
+        if len(self.recent_screen_time) == self.recent_screen_time.maxlen:
+            self.window_sum -= self.recent_screen_time[0]
+        self.recent_screen_time.append(float(screen_time_minutes))
+        self.window_sum += float(screen_time_minutes)
+        self.cumulative_meeting_minutes += float(meetings_attended) * float(average_meeting_duration)
+        self.deficit_streak = self.deficit_streak + 1 if breaks_taken < BREAK_DEFICIT_THRESHOLD else 0
+        return {
+            "Screen_Time_7d_Mean": self.window_sum / len(self.recent_screen_time),
+            "Cumulative_Meeting_Minutes": self.cumulative_meeting_minutes,
+            "Break_Deficit_Streak": self.deficit_streak,
+        }
+
+
+class RollingFeatureState:
+    def __init__(self, window=WINDOW_DAYS):
+        self.window = window
+        self.employees = {}
+
+    # Append one employee-day (a dict or Series with the raw columns) and return
+    # its rolling features.
+    def update(self, record):
+        state = self.employees.get(record["employee_id"])
+        if state is None:
+            state = self.employees[record["employee_id"]] = EmployeeRollingState(self.window)
+        return state.update(record["screen_time_minutes"], record["breaks_taken"],
+                            record["meetings_attended"], record["average_meeting_duration"])
+
+    # Rolling features for the next days of data (e.g. one chunk of a streamed
+    # file), continuing each employee's history from the stored state, which is
+    # then advanced past them. Returns a DataFrame aligned with `df`, like
+    # `compute_rolling_features`; a batch costs one vectorized pass plus a small
+    # per-employee step to store the new tails.
+    def transform(self, df: pd.DataFrame, order_column=None):
+        if len(df) == 0:
+            return compute_rolling_features(df)
+        order = (np.arange(len(df)) if order_column is None
+                 else np.argsort(df[order_column].to_numpy(), kind="stable"))
+        days = df.iloc[order][INPUT_COLUMNS].reset_index(drop=True)
+        days["employee_id"] = days["employee_id"].astype(str)
+
+        # Stored history goes in front as synthetic days: the last screen times,
+        # the meeting total on the first of them, and enough breaks not to extend
+        # a streak (the carried streak is added back below).
+        history, streaks = [], {}
+        for employee_id in days["employee_id"].unique():
+            state = self.employees.get(employee_id)
+            if state is None or not state.recent_screen_time:
+                continue
+            streaks[employee_id] = state.deficit_streak
+            recent = np.asarray(state.recent_screen_time, dtype=np.float64)
+            meetings = np.zeros(len(recent))
+            meetings[0] = state.cumulative_meeting_minutes
+            history.append(pd.DataFrame({"employee_id": employee_id, "screen_time_minutes": recent,
+                                         "breaks_taken": BREAK_DEFICIT_THRESHOLD, "meetings_attended": meetings,
+                                         "average_meeting_duration": 1.0}))
+        combined = pd.concat(history + [days], ignore_index=True) if history else days
+        rolling = compute_rolling_features(combined, self.window).iloc[len(combined) - len(days):]
+        rolling = rolling.reset_index(drop=True)
+
+        # A deficit run that reaches back to the start of the batch continues the stored streak.
+        carried = days["employee_id"].map(streaks).fillna(0).astype(np.int64)
+        unbroken = rolling["Break_Deficit_Streak"] == days.groupby("employee_id", sort=False).cumcount() + 1
+        rolling["Break_Deficit_Streak"] += np.where(unbroken, carried, 0)
+
+        # Advance the state: last `window` screen times, meeting total and streak.
+        tails = combined.groupby("employee_id", sort=False)["screen_time_minutes"].apply(
+            lambda s: s.to_numpy(dtype=np.float64)[-self.window:].tolist())
+        last = rolling.assign(employee_id=days["employee_id"]).groupby("employee_id", sort=False)[
+            ["Cumulative_Meeting_Minutes", "Break_Deficit_Streak"]].last()
+        for employee_id, row in last.iterrows():
+            self.employees[employee_id] = EmployeeRollingState(
+                self.window, tails[employee_id], row["Cumulative_Meeting_Minutes"], row["Break_Deficit_Streak"])
+
+        # Scatter back to the original row order.
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return rolling.iloc[inverse].set_axis(df.index)
+
+    # Seed the per-employee state from a batch of history: only each employee's
+    # last `window` screen times, meeting total and current streak are kept.
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, window=WINDOW_DAYS, order_column=None):
+        state = cls(window)
+        state.transform(df, order_column)
+        return state
+
+    # --- Persistence ---
+    def save(self, path):
+        payload = {
+            "window": self.window,
+            "employees": {
+                str(employee_id): {
+                    "recent_screen_time": list(s.recent_screen_time),
+                    "cumulative_meeting_minutes": s.cumulative_meeting_minutes,
+                    "deficit_streak": s.deficit_streak,
+                }
+                for employee_id, s in self.employees.items()
+            },
+        }
+        with open(path, "w") as fh:
+            json.dump(payload, fh)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            payload = json.load(fh)
+        state = cls(payload["window"])
+        for employee_id, s in payload["employees"].items():
+            state.employees[employee_id] = EmployeeRollingState(
+                state.window, s["recent_screen_time"], s["cumulative_meeting_minutes"], s["deficit_streak"])
+        return state
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# --- Incremental Rollup Store ---
+# Keeps running aggregates of the predicted burnout index per employee, team,
+# country and day of week (plus one global group). For every group it stores
+# count, sum, sum of squares, min, max and a fixed-bin histogram from which
+# approximate quantiles are read. New scored batches are folded in with a few
+# vectorized bincounts, history is never rescanned, and dashboard queries by
+# team or employee are answered from the stored aggregates alone.
+#
+# The store is persisted as one .npz file (plus the ids of batches already
+# folded in, so re-submitting the same upload does not double count).
+#
+# One instance is shared by every Streamlit session thread (see
+# get_rollup_store), so updates, queries and saves are serialized by a lock.
+
+DEFAULT_STORE_PATH = "data/rollups/burnout_rollup.npz"
+DIMENSIONS = ["employee_id", "team", "country", "day_of_week"]
+ALL_GROUP = "__all__"
+VALUE_COLUMN = "Predicted_Burnout_Index"
+# Quantile sketch: HIST_BINS equal-width bins over [HIST_MIN, HIST_MAX]; values
+# outside are clipped into the edge bins. Quantile error is at most one bin width.
+HIST_MIN, HIST_MAX, HIST_BINS = 0.0, 100.0, 200
+
+_STAT_FIELDS = ["count", "sum", "sum_sq", "min", "max"]
+
+
+class _DimensionRollup:
+    def __init__(self, keys=None, stats=None, hist=None):
+        self.keys = list(keys) if keys is not None else []
+        self.stats = stats if stats is not None else np.empty((0, len(_STAT_FIELDS)))
+        self.hist = hist if hist is not None else np.empty((0, HIST_BINS), dtype=np.int64)
+        self._index = {key: i for i, key in enumerate(self.keys)}
+
+    # Fold one batch in: `codes` are group numbers into `batch_keys` for each value.
+    def update(self, batch_keys, codes, values, bin_idx):
+        n_groups = len(batch_keys)
+        count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+        total = np.bincount(codes, weights=values, minlength=n_groups)
+        total_sq = np.bincount(codes, weights=values * values, minlength=n_groups)
+        group_min = np.full(n_groups, np.inf)
+        group_max = np.full(n_groups, -np.inf)
+        np.minimum.at(group_min, codes, values)
+        np.maximum.at(group_max, codes, values)
+        hist = np.bincount(codes * HIST_BINS + bin_idx, minlength=n_groups * HIST_BINS).reshape(n_groups, HIST_BINS)
+
+        # Map batch groups onto stored rows, appending rows for unseen groups.
+        new_keys = [key for key in batch_keys if key not in self._index]
+        if new_keys:
+            for key in new_keys:
+                self._index[key] = len(self.keys)
+                self.keys.append(key)
+            empty = np.tile([0.0, 0.0, 0.0, np.inf, -np.inf], (len(new_keys), 1))
+            self.stats = np.vstack([self.stats, empty])
+            self.hist = np.vstack([self.hist, np.zeros((len(new_keys), HIST_BINS), dtype=np.int64)])
+        rows = np.fromiter((self._index[key] for key in batch_keys), dtype=np.intp, count=n_groups)
+
+        self.stats[rows, 0] += count
+        self.stats[rows, 1] += total
+        self.stats[rows, 2] += total_sq
+        self.stats[rows, 3] = np.minimum(self.stats[rows, 3], group_min)
+        self.stats[rows, 4] = np.maximum(self.stats[rows, 4], group_max)
+        self.hist[rows] += hist
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        count, total, total_sq, vmin, vmax = self.stats.T if len(self.keys) else [np.empty(0)] * 5
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            # Sample standard deviation (ddof=1, like pandas).
+            std = np.sqrt(np.maximum(total_sq - count * mean ** 2, 0.0) / (count - 1))
+        frame = pd.DataFrame({"count": count.astype(np.int64), "mean": mean, "std": std, "min": vmin, "max": vmax},
+                             index=pd.Index(self.keys, name="group"))
+        for q in quantiles:
+            # Bin interpolation can overshoot the exact extremes; clamp to them.
+            frame[f"p{round(q * 100):g}"] = np.clip(histogram_quantile(self.hist, q), vmin, vmax)
+        return frame
+
+
+# Approximate quantile q of each histogram row, interpolating linearly inside the bin.
+def histogram_quantile(hist, q):
+    if len(hist) == 0:
+        return np.empty(0)
+    width = (HIST_MAX - HIST_MIN) / HIST_BINS
+    cumulative = np.cumsum(hist, axis=1)
+    totals = cumulative[:, -1]
+    target = q * totals
+    bin_idx = np.minimum((cumulative < target[:, None]).sum(axis=1), HIST_BINS - 1)
+    rows = np.arange(len(hist))
+    before = np.where(bin_idx > 0, cumulative[rows, bin_idx - 1], 0)
+    in_bin = hist[rows, bin_idx]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(in_bin > 0, (target - before) / in_bin, 0.5)
+        return np.where(totals > 0, HIST_MIN + (bin_idx + fraction) * width, np.nan)
+
+
+class RollupStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, dimensions=DIMENSIONS, value_column=VALUE_COLUMN):
+        self.path = path
+        self.dimensions = list(dimensions)
+        self.value_column = value_column
+        self.batches = set()
+        self._rollups = {name: _DimensionRollup() for name in self.dimensions + [ALL_GROUP]}
+        self._lock = threading.Lock()
+
+    # Fold a scored DataFrame into the rollups. Returns False (and changes nothing)
+    # if `batch_id` was already folded in, e.g. the same upload scored again.
+    def update(self, df: pd.DataFrame, batch_id=None):
+        with self._lock:
+            if batch_id is not None and batch_id in self.batches:
+                return False
+            self._update(df)
+            if batch_id is not None:
+                self.batches.add(batch_id)
+            return True
+
+    def _update(self, df):
+        values = df[self.value_column].to_numpy(dtype=np.float64)
+        valid = np.isfinite(values)
+        values = values[valid]
+        bin_idx = np.clip(((values - HIST_MIN) / (HIST_MAX - HIST_MIN) * HIST_BINS).astype(np.int64), 0, HIST_BINS - 1)
+
+        for name in self.dimensions:
+            if name not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[name].astype(str).to_numpy()[valid])
+            self._rollups[name].update(list(uniques), codes, values, bin_idx)
+        self._rollups[ALL_GROUP].update([ALL_GROUP], np.zeros(len(values), dtype=np.intp), values, bin_idx)
+
+    # Aggregates per group of `dimension` ("team", "employee_id", ...), optionally
+    # only for the given group keys.
+    def query(self, dimension, keys=None, quantiles=(0.5, 0.9, 0.99)):
+        with self._lock:
+            frame = self._rollups[dimension].summary(quantiles)
+        if keys is not None:
+            frame = frame.reindex([str(k) for k in keys]).dropna(how="all")
+        return frame
+
+    # The `n` groups of `dimension` with the highest value of `by` (default: mean).
+    def top(self, dimension, n=10, by="mean", min_count=1):
+        frame = self.query(dimension)
+        return frame[frame["count"] >= min_count].nlargest(n, by)
+
+    def overall(self):
+        return self.query(ALL_GROUP).iloc[0] if self._rollups[ALL_GROUP].keys else None
+
+    # --- Persistence ---
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            arrays = {}
+            for name, rollup in self._rollups.items():
+                arrays[f"{name}__keys"] = np.asarray(rollup.keys, dtype=str)
+                arrays[f"{name}__stats"] = rollup.stats
+                arrays[f"{name}__hist"] = rollup.hist
+            meta = {"dimensions": self.dimensions, "value_column": self.value_column,
+                    "batches": sorted(self.batches), "hist": [HIST_MIN, HIST_MAX, HIST_BINS]}
+            arrays["meta"] = np.asarray(json.dumps(meta))
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)  # Atomic: readers never see a half-written store
+        return path
+
+    # Load the store at `path`, or return an empty one if it does not exist yet.
+    @classmethod
+    def load(cls, path=DEFAULT_STORE_PATH):
+        if not os.path.exists(path):
+            return cls(path)
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["hist"] != [HIST_MIN, HIST_MAX, HIST_BINS]:
+                raise ValueError(f"Rollup store '{path}' uses a different histogram layout: {meta['hist']}")
+            store = cls(path, meta["dimensions"], meta["value_column"])
+            store.batches = set(meta["batches"])
+            for name in store._rollups:
+                store._rollups[name] = _DimensionRollup(
+                    data[f"{name}__keys"].tolist(), data[f"{name}__stats"], data[f"{name}__hist"])
+        return store
+
+
+# Process-wide store instances (one per path), so Streamlit reruns reuse the
+# loaded aggregates instead of reading the file again.
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_rollup_store(path=DEFAULT_STORE_PATH):
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = RollupStore.load(path)
+        return _stores[key]
@@ -0,0 +1,352 @@
+import argparse
+import asyncio
+import http.client
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from feature_extraction import MODEL_FEATURES
+from feature_transformer import load_transformer_for_model
+from flat_forest import load_flat_forest
+from ingestion import RAW_SCHEMA
+from model_artifact import is_artifact_path, load_artifact
+from model_variants import select_variant
+from model_registry import get_model
+
+# --- HTTP/JSON Scoring Service ---
+# A small asyncio HTTP server that loads the model once and scores raw activity
+# records (the columns of data/remote_mind_data.csv) sent as JSON:
+#
+#   POST /score    {"screen_time_minutes": 420, "breaks_taken": 3, ...}
+#                  or {"records": [{...}, {...}]}  or  [{...}, {...}]
+#   GET  /metrics  latency percentiles, batch sizes and request counts
+#   GET  /health
+#
+# Concurrent requests are coalesced by a MicroBatcher: the first pending request
+# opens a short window (`batch_window_ms`), everything that arrives within it is
+# scored with a single predict call, and each caller gets its own slice back.
+#
+# Usage (from the project root):
+#   python app/scoring_service.py --port 8765
+#   curl -s localhost:8765/score -d '{"screen_time_minutes": 420, "breaks_taken": 3}'
+
+DEFAULT_MODEL_PATH = "models/burnout_model.pkl"
+RAW_COLUMNS = ["screen_time_minutes", "breaks_taken"]
+# Valid ranges of the raw columns, shared with file ingestion.
+RAW_SPECS = {spec.name: spec for spec in RAW_SCHEMA if spec.name in RAW_COLUMNS}
+LATENCY_WINDOW = 10_000  # Number of recent requests kept for percentile metrics
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# Turn a decoded JSON body into a list of record dicts.
+def parse_records(payload):
+    if isinstance(payload, dict):
+        payload = payload["records"] if "records" in payload else [payload]
+    if not isinstance(payload, list) or not payload or not all(isinstance(r, dict) for r in payload):
+        raise BadRequest("Expected a record object, a non-empty list of records, or {\"records\": [...]}.")
+    for i, record in enumerate(payload):
+        missing = [c for c in RAW_COLUMNS if c not in record]
+        if missing:
+            raise BadRequest(f"Record {i} is missing required columns: {missing}")
+        # Checked here, per request, so one bad record cannot fail the other
+        # requests coalesced into the same micro-batch.
+        invalid = [c for c in RAW_COLUMNS if not _is_finite_number(record[c])]
+        if invalid:
+            raise BadRequest(f"Record {i} has non-numeric or non-finite values for: {invalid}")
+        for column in RAW_COLUMNS:
+            spec = RAW_SPECS[column]
+            if not spec.min_value <= float(record[column]) <= spec.max_value:
+                raise BadRequest(f"Record {i}: {column} must be between {spec.min_value} and {spec.max_value}")
+    return payload
+
+
+def _is_finite_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(float(value))
+    except (OverflowError, ValueError, TypeError):
+        return False  # e.g. an integer too large for a float
+
+
+# --- Scorer ---
+# Raw records -> burnout predictions, using the statistics saved with the model
+# so that a single record is scored exactly like the same row in a full file.
+class Scorer:
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, engine="flat"):
+        # A compact .npz artifact carries its own statistics and predicts with the
+        # flattened forest (or linear model) it holds; it starts fastest since
+        # sklearn is never imported.
+        if is_artifact_path(model_path):
+            artifact = get_model(model_path, loader=load_artifact)
+            self.transformer, self.predictor = artifact.transformer, artifact
+            return
+
+        self.transformer = load_transformer_for_model(model_path)
+        if self.transformer is None:
+            raise FileNotFoundError(
+                f"No feature statistics found next to '{model_path}'. Retrain with src/model.py "
+                "so single records can be normalized consistently.")
+        if engine == "flat":
+            self.predictor = get_model(model_path, loader=load_flat_forest)
+        elif engine == "sklearn":
+            self.predictor = get_model(model_path)
+        else:
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'flat' or 'sklearn')")
+
+    def score(self, records):
+        frame = pd.DataFrame.from_records(records, columns=RAW_COLUMNS).astype(np.float64)
+        features = self.transformer.transform(frame)[MODEL_FEATURES]
+        return np.asarray(self.predictor.predict(features), dtype=np.float64)
+
+
+# --- Metrics ---
+class ServiceMetrics:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.records = 0
+        self.errors = 0
+        self.batches = 0
+
+    def record_request(self, latency_ms, n_records):
+        self.requests += 1
+        self.records += n_records
+        self.latencies_ms.append(latency_ms)
+
+    def record_batch(self, n_records):
+        self.batches += 1
+        self.batch_sizes.append(n_records)
+
+    def snapshot(self):
+        latencies = np.asarray(self.latencies_ms, dtype=np.float64)
+        batch_sizes = np.asarray(self.batch_sizes, dtype=np.float64)
+        percentile = lambda a, q: round(float(np.percentile(a, q)), 3) if len(a) else None
+        return {
+            "requests": self.requests,
+            "records": self.records,
+            "errors": self.errors,
+            "batches": self.batches,
+            "latency_ms": {"p50": percentile(latencies, 50), "p99": percentile(latencies, 99),
+                           "max": percentile(latencies, 100)},
+            "batch_size": {"mean": round(float(batch_sizes.mean()), 3) if len(batch_sizes) else None,
+                           "p50": percentile(batch_sizes, 50), "max": percentile(batch_sizes, 100)},
+        }
+
+
+# --- Micro-batching ---
+class MicroBatcher:
+    def __init__(self, scorer, metrics, batch_window_ms=2.0, max_batch_records=4096):
+        self.scorer = scorer
+        self.metrics = metrics
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_records = max_batch_records
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    # Queue records for scoring and wait for their predictions.
+    async def submit(self, records):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            n_records = len(pending[0][0])
+            deadline = loop.time() + self.batch_window
+
+            # Keep collecting until the window closes or the batch is full.
+            while n_records < self.max_batch_records:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                n_records += len(item[0])
+
+            records = [record for batch, _ in pending for record in batch]
+            try:
+                # Predict in a worker thread so the loop keeps accepting requests.
+                predictions = await loop.run_in_executor(None, self.scorer.score, records)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.metrics.record_batch(len(records))
+            start = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(predictions[start:start + len(batch)])
+                start += len(batch)
+
+
+# --- HTTP Server ---
+class ScoringService:
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, engine="flat", batch_window_ms=2.0, max_batch_records=4096):
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(Scorer(model_path, engine), self.metrics, batch_window_ms, max_batch_records)
+        self._server = None
+
+    # Start listening; returns the bound port (pass port=0 to pick a free one).
+    async def start(self, host="127.0.0.1", port=8765):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if method == "POST" and path == "/score":
+            start = time.perf_counter()
+            try:
+                records = parse_records(json.loads(body.decode("utf-8") if body else "null"))
+            except (UnicodeDecodeError, json.JSONDecodeError, BadRequest) as e:
+                self.metrics.errors += 1
+                return 400, {"error": str(e)}
+            try:
+                predictions = await self.batcher.submit(records)
+            except Exception as e:
+                self.metrics.errors += 1
+                return 500, {"error": str(e)}
+            self.metrics.record_request((time.perf_counter() - start) * 1000.0, len(records))
+            return 200, {"predictions": predictions.tolist()}
+        return 404, {"error": f"No route for {method} {path}"}
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+
+
+# --- Local Client ---
+# Minimal blocking client for internal tools and offline checks against a
+# service running on this machine.
+class ScoringClient:
+    def __init__(self, host="127.0.0.1", port=8765, timeout=10.0):
+        self._conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        headers = {} if body is None else {"Content-Type": "application/json"}
+        self._conn.request(method, path, body=body, headers=headers)
+        response = self._conn.getresponse()
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {data.get('error')}")
+        return data
+
+    # Score one record (dict) or many (list of dicts); returns a float or a list of floats.
+    def score(self, records):
+        predictions = self._request("POST", "/score", {"records": records if isinstance(records, list) else [records]})
+        return predictions["predictions"] if isinstance(records, list) else predictions["predictions"][0]
+
+    def metrics(self):
+        return self._request("GET", "/metrics")
+
+    def close(self):
+        self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve burnout predictions over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH,
+                        help="Pickled model, or a .npz artifact for the fastest start-up (no sklearn import)")
+    parser.add_argument("--engine", choices=["flat", "sklearn"], default="flat",
+                        help="Prediction engine: flattened NumPy forest (default) or sklearn")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0,
+                        help="How long to wait for more requests before predicting a batch")
+    parser.add_argument("--max-batch-records", type=int, default=4096)
+    parser.add_argument("--latency-budget-ms", type=float,
+                        help="Serve the most accurate compact model variant whose single-record predict latency "
+                             "fits this budget (see model_variants.py)")
+    args = parser.parse_args(argv)
+    if args.latency_budget_ms is not None:
+        args.model, variant = select_variant(args.model, args.latency_budget_ms)
+        print(f"Using model variant '{variant['name']}' ({args.model}, CV R^2 {variant['r2']:.4f})")
+
+    async def run():
+        service = ScoringService(args.model, args.engine, args.batch_window_ms, args.max_batch_records)
+        port = await service.start(args.host, args.port)
+        print(f"Scoring service listening on http://{args.host}:{port}")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
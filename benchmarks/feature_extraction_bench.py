@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Make app/ modules importable when running `python benchmarks/feature_extraction_bench.py`.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from feature_extraction import MODEL_FEATURES, create_feature_matrix, create_features, read_feature_inputs
+from synthetic_data import write_synthetic_csv
+
+# --- Feature Extraction Benchmark ---
+# Compares the current app path (read every column with inferred dtypes, copy the
+# frame, add features column by column) with the vectorized path (read only the
+# two input columns as float32, compute all features into one preallocated
+# matrix). Reports wall time and peak traced memory (tracemalloc) per path.
+
+
+def current_path(csv_path):
+    df = pd.read_csv(csv_path)
+    processed = create_features(df.copy())
+    return processed[MODEL_FEATURES].to_numpy()
+
+
+def vectorized_path(csv_path):
+    return create_feature_matrix(read_feature_inputs(csv_path))
+
+
+def measure(fn, csv_path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(csv_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark create_features against create_feature_matrix.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--csv", help="Use an existing CSV instead of generating a synthetic one")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv or write_synthetic_csv(os.path.join(tmp, "activity.csv"), args.rows)
+        current, current_s, current_peak = measure(current_path, csv_path)
+        vectorized, vectorized_s, vectorized_peak = measure(vectorized_path, csv_path)
+
+    assert np.array_equal(current, vectorized), "vectorized features differ from create_features"
+    print(f"{len(current):,} rows")
+    print(f"{'path':12s} {'seconds':>9s} {'peak MiB':>10s}")
+    print(f"{'current':12s} {current_s:9.3f} {current_peak / 2**20:10.1f}")
+    print(f"{'vectorized':12s} {vectorized_s:9.3f} {vectorized_peak / 2**20:10.1f}")
+    print(f"speedup {current_s / vectorized_s:.1f}x, memory saved {(1 - vectorized_peak / current_peak) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
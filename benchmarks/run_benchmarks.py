@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Make app/ modules importable when running `python benchmarks/run_benchmarks.py`.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from feature_extraction import MODEL_FEATURES, create_feature_matrix, create_features
+from flat_forest import FlatForest
+from synthetic_data import generate_activity_data
+
+# --- Pipeline Benchmark Suite ---
+# Times each stage of the pipeline on synthetic data with the schema of
+# data/remote_mind_data.csv and writes the results as JSON, so runs can be
+# compared across commits:
+#
+#   python benchmarks/run_benchmarks.py --rows 100000 --output bench/main.json
+#   python benchmarks/run_benchmarks.py --rows 100000 --compare bench/main.json --threshold 0.2
+#
+# Each benchmark is run `--repeat` times and the median is reported. With
+# `--compare`, any benchmark slower than the baseline by more than `--threshold`
+# (a fraction, 0.2 = 20%) is listed and the script exits with status 1.
+
+DEFAULT_MODEL_PATH = "models/burnout_model.pkl"
+DEFAULT_BATCH_SIZES = [1, 100, 10_000, 100_000]
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(rows, model_path=DEFAULT_MODEL_PATH, batch_sizes=DEFAULT_BATCH_SIZES, train_rows=100_000,
+                   repeat=3, seed=0):
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.linear_model import LinearRegression
+
+    results = {}
+
+    def record(name, seconds, n_rows):
+        results[name] = {"seconds": seconds, "rows": n_rows, "rows_per_sec": n_rows / seconds if seconds else None}
+        print(f"{name:40s} {seconds * 1000:12.3f} ms  {n_rows / max(seconds, 1e-12):14,.0f} rows/sec")
+
+    raw = generate_activity_data(rows, seed=seed)
+
+    # --- Feature extraction ---
+    record("features.create_features", time_call(lambda: create_features(raw.copy()), repeat), rows)
+    record("features.create_feature_matrix", time_call(lambda: create_feature_matrix(raw), repeat), rows)
+
+    features = create_features(raw.copy())
+    X, y = features[MODEL_FEATURES], features["burnout_index"]
+
+    # --- Training (on at most `train_rows` rows, so large scales stay tractable) ---
+    n_train = min(rows, train_rows)
+    X_train, y_train = X.iloc[:n_train], y.iloc[:n_train]
+    record("train.linear_regression", time_call(lambda: LinearRegression().fit(X_train, y_train), repeat), n_train)
+    record("train.random_forest",
+           time_call(lambda: RandomForestRegressor(n_estimators=100, random_state=42).fit(X_train, y_train), 1),
+           n_train)
+
+    # --- Model load and prediction with the deployed model ---
+    record("model.load", time_call(lambda: joblib.load(model_path), repeat), 1)
+    model = joblib.load(model_path)
+    forest = FlatForest.from_model(model)
+    for batch_size in batch_sizes:
+        if batch_size > rows:
+            continue
+        batch = X.iloc[:batch_size]
+        matrix = batch.to_numpy()
+        record(f"predict.sklearn.batch_{batch_size}", time_call(lambda: model.predict(batch), repeat), batch_size)
+        record(f"predict.flat.batch_{batch_size}", time_call(lambda: forest.predict(matrix), repeat), batch_size)
+
+    return results
+
+
+# Benchmarks whose time grew by more than `threshold` relative to the baseline.
+def find_regressions(results, baseline, threshold):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or not previous["seconds"]:
+            continue
+        change = current["seconds"] / previous["seconds"] - 1
+        if change > threshold:
+            regressions.append((name, previous["seconds"], current["seconds"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark feature extraction, training, model load and predict.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic rows (e.g. 1000 to 10000000)")
+    parser.add_argument("--train-rows", type=int, default=100_000, help="Cap on rows used for training benchmarks")
+    parser.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.model, [int(b) for b in args.batch_sizes.split(",")],
+                             args.train_rows, args.repeat, args.seed)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "rows": args.rows,
+            "train_rows": min(args.rows, args.train_rows),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if baseline.get("meta", {}).get("rows") != args.rows:
+            print(f"Warning: baseline was run with {baseline.get('meta', {}).get('rows')} rows, this run with {args.rows}.")
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+            for name, before, after, change in regressions:
+                print(f"  {name:40s} {before * 1000:10.3f} ms -> {after * 1000:10.3f} ms (+{change:.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# --- Synthetic Activity Data ---
+# Generates employee-day rows with the same schema, value ranges and category
+# levels as data/remote_mind_data.csv, at any scale, for benchmarks.
+# Rows are ordered day by day (every employee for day 0, then day 1, ...), like
+# a daily activity export.
+
+TEAMS = ["Design", "Engineering", "Sales", "Support"]
+COUNTRIES = ["Canada", "Germany", "India", "UK", "USA"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+COLUMNS = [
+    "employee_id", "team", "country", "screen_time_minutes", "breaks_taken", "meetings_attended",
+    "average_meeting_duration", "typing_speed_wpm", "day_of_week", "reported_stress_level", "burnout_index",
+]
+
+
+# Generate `n_rows` rows starting at global row `start` of a dataset of
+# `total_rows` rows (so chunks of one dataset can be produced independently and
+# still line up). The dataset covers `n_days` days, one row per employee per day.
+def generate_activity_data(n_rows, seed=0, n_days=20, start=0, total_rows=None):
+    total_rows = start + n_rows if total_rows is None else total_rows
+    n_employees = max(1, -(-total_rows // n_days))
+    rng = np.random.default_rng([seed, start])
+    row = np.arange(start, start + n_rows)
+    employee = row % n_employees
+    day = row // n_employees
+
+    # Employee attributes are derived from the employee number, so they are
+    # stable across chunks and days.
+    team = np.asarray(TEAMS)[employee % len(TEAMS)]
+    country = np.asarray(COUNTRIES)[(employee * 7) % len(COUNTRIES)]
+
+    screen_time = np.clip(rng.normal(424, 85, n_rows), 240, 720).round()
+    breaks = np.clip(rng.normal(3.9, 1.7, n_rows), 0, 10).round()
+    meetings = np.clip(rng.normal(4.4, 1.9, n_rows), 0, 12).round()
+    meeting_duration = np.clip(rng.normal(31, 10, n_rows), 10, 60).round()
+    typing_speed = np.clip(rng.normal(48, 5, n_rows), 30, 70).round()
+    burnout = np.clip(
+        0.12 * screen_time + 2.5 * meetings - 3.0 * breaks + rng.normal(20, 6, n_rows), 0, 100).round()
+    stress = np.clip((burnout / 10).round() + rng.integers(-1, 2, n_rows), 1, 10)
+
+    return pd.DataFrame({
+        "employee_id": np.char.add("E", np.char.zfill((employee + 1).astype(str), 6)),
+        "team": team,
+        "country": country,
+        "screen_time_minutes": screen_time.astype(np.int64),
+        "breaks_taken": breaks.astype(np.int64),
+        "meetings_attended": meetings.astype(np.int64),
+        "average_meeting_duration": meeting_duration.astype(np.int64),
+        "typing_speed_wpm": typing_speed.astype(np.int64),
+        "day_of_week": np.asarray(DAYS)[day % len(DAYS)],
+        "reported_stress_level": stress.astype(np.int64),
+        "burnout_index": burnout.astype(np.int64),
+    }, columns=COLUMNS)
+
+
+# Write a synthetic CSV of `n_rows` rows in chunks, so even 10M+ rows never sit in memory at once.
+def write_synthetic_csv(path, n_rows, seed=0, n_days=20, chunk_rows=1_000_000):
+    with open(path, "w", newline="") as out:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = generate_activity_data(min(chunk_rows, n_rows - start), seed, n_days, start, n_rows)
+            chunk.to_csv(out, header=(start == 0), index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic activity CSV matching data/remote_mind_data.csv.")
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=20, help="Days per employee (rows are split across employees)")
+    args = parser.parse_args(argv)
+    write_synthetic_csv(args.output, args.rows, args.seed, args.days)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,28 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 import joblib
 import numpy as np # Often useful for RMSE
+import os
+import sys
+
+# The feature pipeline lives in app/; make it importable when running `python src/model.py`.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from feature_transformer import FeatureTransformer, stats_path_for
+from columnar_io import read_table
+from model_variants import build_variants, format_report, report_path_for
+from drift_monitor import DriftProfile, drift_path_for
 
 # --- 1. Load Data ---
-# Load the dataset from the specified CSV file path.
+# Prefer the columnar feature cache written by app/data_processing.py, reading
+# only the columns training needs; fall back to the processed CSV.
 # Ensure 'data/remote_mind_data_processed2.csv' exists in your project structure.
+processed_parquet = 'data/remote_mind_data_processed2.parquet'
+training_columns = ['screen_time_minutes', 'Video_Call_Score', 'Break_Efficiency',
+                    'Average_Screen_Time_Hours', 'Cognitive_Load_Index', 'burnout_index']
 try:
-    data = pd.read_csv(r'data/remote_mind_data_processed2.csv')
+    if os.path.exists(processed_parquet):
+        data = read_table(processed_parquet, columns=training_columns)
+    else:
+        data = pd.read_csv(r'data/remote_mind_data_processed2.csv')
     print("Data loaded successfully.")
     print(f"Dataset shape: {data.shape}")
     print("Columns available:", data.columns.tolist())
@@ -77,7 +93,9 @@ print("\n--- Training Random Forest Regressor Model ---")
 # n_estimators: The number of trees in the forest. More trees generally improve performance
 #               but increase computation time. 100 is a good starting point.
 # random_state: Ensures reproducibility of the results.
-rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+# n_jobs=-1: Build the trees on all CPU cores (results do not depend on n_jobs).
+# For hyperparameter search, warm-starting and cached folds see src/training.py.
+rf_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
 
 # Train the Random Forest model
 rf_model.fit(X_train, Y_train)
@@ -114,6 +132,35 @@ try:
 except Exception as e:
     print(f"\nError saving model: {e}")
 
+# Persist the normalization statistics of the training data next to the model, so
+# scoring (chunked, parallel or single-row) scales features exactly as in training.
+try:
+    transformer = FeatureTransformer().fit(data)
+    transformer.save(stats_path_for(model_filename))
+    print(f"Feature statistics saved to '{stats_path_for(model_filename)}'")
+except Exception as e:
+    print(f"Error saving feature statistics: {e}")
+
+# Reference histograms of the training features, used to detect drift in the
+# data being scored (see app/drift_monitor.py).
+try:
+    DriftProfile.from_frame(X_train).save(drift_path_for(model_filename))
+    print(f"Drift profile saved to '{drift_path_for(model_filename)}'")
+except Exception as e:
+    print(f"Error saving drift profile: {e}")
+
+# Also export the compact artifact (flattened trees + stats in one mmap-able .npz)
+# used by the CLI and scoring service for fast start-up without sklearn, plus
+# smaller variants (float32, fewer/shallower trees, the linear model above) and
+# a report of their accuracy vs. speed and size (see app/model_variants.py).
+try:
+    report = build_variants(model_to_save, X_train, Y_train, X_test, Y_test, transformer, model_filename,
+                            linear_model=linear_model)
+    print(f"\nModel artifact and variants saved; report in '{report_path_for(model_filename)}':")
+    print(format_report(report))
+except Exception as e:
+    print(f"Error exporting model artifacts: {e}")
+
 # --- Optional: Load and Test the Saved Model ---
 # This block demonstrates how to load a saved model and make predictions.
 print("\n--- Demonstrating Model Loading and Prediction ---")
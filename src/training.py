@@ -0,0 +1,250 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+
+# The feature pipeline lives in app/; make it importable when running `python src/training.py`.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+from columnar_io import read_table
+from feature_extraction import MODEL_FEATURES
+from drift_monitor import DriftProfile, drift_path_for
+from feature_transformer import FeatureTransformer, stats_path_for
+from model_variants import build_variants, report_path_for
+
+# --- Parallel, Incremental Forest Training ---
+# Cross-validated hyperparameter search for the burnout RandomForest:
+#
+#   python src/training.py --n-estimators 50,100,200 --max-depth none,8 --min-samples-leaf 1,3 --n-jobs -1
+#   python src/training.py --warm-start models/burnout_model.pkl --add-trees 50
+#
+# * (configuration, fold) work runs in parallel across cores with joblib.
+# * Within a fold, configurations that only differ in n_estimators are fitted
+#   as one warm-started chain: the 200-tree model is the 100-tree model plus
+#   100 new trees rather than a fresh fit.
+# * Every fitted fold model is cached on disk under a key made of the data
+#   hash, the parameters and the fold, so re-running an unchanged search (or
+#   extending it with more trees) skips the work already done.
+# * Fit wall-time is logged for every configuration (summed over folds; for a
+#   warm-started step it is the time spent growing the extra trees).
+#
+# The best configuration is refitted on the training split, evaluated on the
+# held-out test split and saved together with its feature statistics.
+
+TARGET = "burnout_index"
+PROCESSED_PARQUET = "data/remote_mind_data_processed2.parquet"
+PROCESSED_CSV = "data/remote_mind_data_processed2.csv"
+DEFAULT_CACHE_DIR = "models/.train_cache"
+DEFAULT_MODEL_PATH = "models/burnout_model.pkl"
+RANDOM_STATE = 42
+
+
+def load_training_data(path=None):
+    path = path or (PROCESSED_PARQUET if os.path.exists(PROCESSED_PARQUET) else PROCESSED_CSV)
+    return read_table(path, columns=["screen_time_minutes"] + MODEL_FEATURES + [TARGET])
+
+
+# Stable content hash of the training matrix and target (part of every cache key).
+def data_hash(X, y):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    digest.update(",".join(X.columns).encode())
+    return digest.hexdigest()
+
+
+# --- Fold Cache ---
+class FoldCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, data_digest, params, fold, n_splits):
+        key = json.dumps({"data": data_digest, "params": params, "fold": fold, "n_splits": n_splits,
+                          "random_state": RANDOM_STATE}, sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest()[:32] + ".joblib")
+
+    def load(self, data_digest, params, fold, n_splits):
+        if not self.cache_dir:
+            return None
+        path = self._path(data_digest, params, fold, n_splits)
+        return joblib.load(path) if os.path.exists(path) else None
+
+    def save(self, entry, data_digest, params, fold, n_splits):
+        if self.cache_dir:
+            joblib.dump(entry, self._path(data_digest, params, fold, n_splits))
+
+
+# Fit one fold for a chain of n_estimators values that share all other parameters.
+# Each step reuses the cached model for that size if there is one, otherwise it
+# warm-starts from the previous (smaller) model and only grows the missing trees.
+def fit_fold_chain(X, y, train_idx, test_idx, base_params, n_estimators_list, fold, n_splits, data_digest, cache):
+    X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+    X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
+    results, model = [], None
+
+    for n_estimators in sorted(n_estimators_list):
+        params = dict(base_params, n_estimators=n_estimators)
+        entry = cache.load(data_digest, params, fold, n_splits)
+        cached = entry is not None
+        if cached:
+            model = entry["model"]
+        else:
+            start = time.perf_counter()
+            if model is None:
+                model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=1, warm_start=True, **params)
+            else:
+                model.set_params(n_estimators=n_estimators)
+            model.fit(X_train, y_train)
+            entry = {"model": model, "fit_seconds": time.perf_counter() - start}
+            cache.save(entry, data_digest, params, fold, n_splits)
+
+        predictions = model.predict(X_test)
+        results.append({
+            "params": params,
+            "fold": fold,
+            "r2": r2_score(y_test, predictions),
+            "mae": mean_absolute_error(y_test, predictions),
+            "fit_seconds": entry["fit_seconds"],
+            "cached": cached,
+        })
+    return results
+
+
+# Expand a parameter grid into (base params without n_estimators, n_estimators list).
+def expand_grid(grid):
+    n_estimators_list = grid["n_estimators"]
+    other = {k: v for k, v in grid.items() if k != "n_estimators"}
+    keys = sorted(other)
+    bases = [dict(zip(keys, values)) for values in itertools.product(*(other[k] for k in keys))]
+    return bases, n_estimators_list
+
+
+def search(X, y, grid, n_splits=5, n_jobs=-1, cache_dir=DEFAULT_CACHE_DIR):
+    cache = FoldCache(cache_dir)
+    data_digest = data_hash(X, y)
+    folds = list(KFold(n_splits=n_splits, shuffle=True, random_state=RANDOM_STATE).split(X))
+    bases, n_estimators_list = expand_grid(grid)
+
+    chains = Parallel(n_jobs=n_jobs)(
+        delayed(fit_fold_chain)(X, y, train_idx, test_idx, base, n_estimators_list, fold, n_splits, data_digest, cache)
+        for base in bases
+        for fold, (train_idx, test_idx) in enumerate(folds)
+    )
+
+    # Aggregate fold results per configuration.
+    summary = {}
+    for result in itertools.chain.from_iterable(chains):
+        key = json.dumps(result["params"], sort_keys=True)
+        row = summary.setdefault(key, {"params": result["params"], "r2": [], "mae": [], "fit_seconds": 0.0,
+                                       "cached_folds": 0})
+        row["r2"].append(result["r2"])
+        row["mae"].append(result["mae"])
+        row["fit_seconds"] += 0.0 if result["cached"] else result["fit_seconds"]
+        row["cached_folds"] += result["cached"]
+
+    configs = []
+    for row in summary.values():
+        configs.append({
+            "params": row["params"],
+            "mean_r2": float(np.mean(row["r2"])),
+            "mean_mae": float(np.mean(row["mae"])),
+            "fit_seconds": row["fit_seconds"],
+            "cached_folds": row["cached_folds"],
+        })
+    configs.sort(key=lambda c: c["mean_r2"], reverse=True)
+    return configs
+
+
+# Grow an existing forest by `add_trees` trees fitted on (X, y); existing trees are kept.
+def warm_start_model(model, X, y, add_trees):
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + add_trees)
+    start = time.perf_counter()
+    model.fit(X, y)
+    return model, time.perf_counter() - start
+
+
+def _parse_list(text, cast):
+    return [None if value.strip().lower() == "none" else cast(value) for value in text.split(",")]
+
+
+def _save(model, data, X_train, y_train, X_test, y_test, output):
+    joblib.dump(model, output)
+    transformer = FeatureTransformer().fit(data)
+    transformer.save(stats_path_for(output))
+    DriftProfile.from_frame(X_train).save(drift_path_for(output))
+    build_variants(model, X_train, y_train, X_test, y_test, transformer, output)
+    print(f"Model saved to '{output}' (feature statistics in '{stats_path_for(output)}', "
+          f"drift profile in '{drift_path_for(output)}', artifacts and variant report "
+          f"'{report_path_for(output)}')")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validated, cached, parallel training of the burnout forest.")
+    parser.add_argument("--data", help=f"Processed feature file (default: {PROCESSED_PARQUET} or {PROCESSED_CSV})")
+    parser.add_argument("--n-estimators", default="50,100,200")
+    parser.add_argument("--max-depth", default="none,8,12", help="Comma-separated; 'none' for unlimited depth")
+    parser.add_argument("--min-samples-leaf", default="1,2,4")
+    parser.add_argument("--max-features", default="1.0", help="Comma-separated fractions of features per split")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel workers (-1: all cores)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Fold cache directory ('' disables caching)")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--log", help="Write the per-configuration results as JSON here")
+    parser.add_argument("--warm-start", metavar="MODEL", help="Add trees to this existing model instead of searching")
+    parser.add_argument("--add-trees", type=int, default=50, help="Trees to add with --warm-start")
+    args = parser.parse_args(argv)
+
+    data = load_training_data(args.data)
+    X, y = data[MODEL_FEATURES], data[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+
+    if args.warm_start:
+        model = joblib.load(args.warm_start)
+        before = model.n_estimators
+        model, seconds = warm_start_model(model, X_train, y_train, args.add_trees)
+        print(f"Warm start: {before} -> {model.n_estimators} trees in {seconds:.2f}s")
+        print(f"Test R^2: {model.score(X_test, y_test):.4f}  MAE: {mean_absolute_error(y_test, model.predict(X_test)):.4f}")
+        _save(model, data, X_train, y_train, X_test, y_test, args.output)
+        return
+
+    grid = {
+        "n_estimators": _parse_list(args.n_estimators, int),
+        "max_depth": _parse_list(args.max_depth, int),
+        "min_samples_leaf": _parse_list(args.min_samples_leaf, int),
+        "max_features": _parse_list(args.max_features, float),
+    }
+    start = time.perf_counter()
+    configs = search(X_train, y_train, grid, args.folds, args.n_jobs, args.cache_dir or None)
+    print(f"Searched {len(configs)} configurations x {args.folds} folds in {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'mean R^2':>9s} {'mean MAE':>9s} {'fit s':>8s} {'cached':>7s}  params")
+    for config in configs:
+        print(f"{config['mean_r2']:9.4f} {config['mean_mae']:9.4f} {config['fit_seconds']:8.2f} "
+              f"{config['cached_folds']:>3d}/{args.folds:<3d}  {json.dumps(config['params'], sort_keys=True)}")
+
+    if args.log:
+        with open(args.log, "w") as fh:
+            json.dump(configs, fh, indent=2)
+
+    best = configs[0]["params"]
+    start = time.perf_counter()
+    model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=args.n_jobs, **best).fit(X_train, y_train)
+    print(f"\nBest {json.dumps(best, sort_keys=True)} refitted in {time.perf_counter() - start:.2f}s")
+    print(f"Test R^2: {model.score(X_test, y_test):.4f}  MAE: {mean_absolute_error(y_test, model.predict(X_test)):.4f}")
+    _save(model, data, X_train, y_train, X_test, y_test, args.output)
+
+
+if __name__ == "__main__":
+    main()